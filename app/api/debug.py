@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Path, Query
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.api.deps import get_current_superuser, get_settings
+from app.core import (
+    ConflictError,
+    ResourceNotFoundError,
+    ValidationError,
+    get_logger,
+)
+from app.core.config import Settings
+from app.core.memory import memory_tracker
+from app.core.profiler import profiler
+from app.db.query_stats import query_stats
+from app.models.user import User
+
+logger = get_logger(__name__)
+
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(default=10, gt=0),
+    admin: User = Depends(get_current_superuser),
+    app_settings: Settings = Depends(get_settings),
+):
+    """
+    Sample every thread of this worker for `seconds` (admin only).
+
+    Returns collapsed stacks ("frame;frame;frame count" per line, root
+    first) for flamegraph tools. Stacks serving a request are rooted at
+    "route:<METHOD> <template>". Only one profile runs at a time per worker.
+
+    Raises:
+        ValidationError: If `seconds` exceeds DEBUG_PROFILE_MAX_SECONDS
+        ConflictError: If a profile is already running
+    """
+    if seconds > app_settings.DEBUG_PROFILE_MAX_SECONDS:
+        raise ValidationError(
+            message="Profile too long",
+            details={"max_seconds": app_settings.DEBUG_PROFILE_MAX_SECONDS},
+        )
+    if profiler.running:
+        raise ConflictError("A profile is already running")
+
+    logger.info("Profiling started", seconds=seconds, admin_id=admin.id)
+    result = await run_in_threadpool(profiler.profile, seconds)
+    if result is None:
+        raise ConflictError("A profile is already running")
+
+    logger.info(
+        "Profiling finished",
+        samples=result.samples,
+        overhead=round(result.overhead, 4),
+    )
+    return PlainTextResponse(
+        result.collapsed(),
+        headers={
+            "X-Profile-Samples": str(result.samples),
+            "X-Profile-Duration": f"{result.duration:.3f}",
+            "X-Profile-Overhead": f"{result.overhead:.4f}",
+        },
+    )
+
+
+@router.get("/memory")
+async def memory_status(admin: User = Depends(get_current_superuser)):
+    """Tracing state, traced heap size and snapshot names (admin only)."""
+    return memory_tracker.status()
+
+
+@router.post("/memory/start")
+async def start_memory_tracing(
+    frames: int | None = Query(default=None, ge=1, le=100),
+    admin: User = Depends(get_current_superuser),
+):
+    """
+    Start tracemalloc, keeping `frames` (default MEMORY_TRACE_FRAMES) frames
+    per allocation (admin only).
+
+    Tracing slows down every allocation; stop it once done.
+    """
+    if not memory_tracker.tracing:
+        logger.info("Memory tracing requested", frames=frames, admin_id=admin.id)
+        memory_tracker.start(frames)
+    return memory_tracker.status()
+
+
+@router.post("/memory/stop")
+async def stop_memory_tracing(admin: User = Depends(get_current_superuser)):
+    """Stop tracemalloc and drop all snapshots (admin only)."""
+    memory_tracker.stop()
+    return memory_tracker.status()
+
+
+@router.post("/memory/snapshots/{name}")
+async def take_memory_snapshot(
+    name: str = Path(pattern=r"^[\w.-]{1,64}$"),
+    admin: User = Depends(get_current_superuser),
+):
+    """
+    Take a snapshot named `name`, replacing an older one (admin only).
+
+    Raises:
+        ConflictError: If tracing isn't running
+    """
+    if not memory_tracker.tracing:
+        raise ConflictError("Memory tracing is not running")
+    try:
+        await run_in_threadpool(memory_tracker.take_snapshot, name)
+    except RuntimeError:
+        # Tracing was stopped while the snapshot was taken
+        raise ConflictError("Memory tracing is not running")
+    return memory_tracker.status()
+
+
+@router.get("/memory/diff")
+async def memory_diff(
+    base: str,
+    against: str | None = None,
+    limit: int | None = Query(default=None, ge=1, le=1000),
+    admin: User = Depends(get_current_superuser),
+):
+    """
+    Top allocation changes by file and line from `base` to `against`
+    (admin only).
+
+    Without `against`, `base` is compared to the current heap. Sites are
+    sorted by absolute size change.
+
+    Raises:
+        ConflictError: If tracing isn't running
+        ResourceNotFoundError: If a snapshot doesn't exist
+    """
+    if not memory_tracker.tracing:
+        raise ConflictError("Memory tracing is not running")
+    try:
+        sites = await run_in_threadpool(memory_tracker.diff, base, against, limit)
+    except KeyError as e:
+        raise ResourceNotFoundError("Snapshot", e.args[0])
+    except RuntimeError:
+        # Tracing was stopped meanwhile
+        raise ConflictError("Memory tracing is not running")
+    return {"base": base, "against": against, "sites": sites}
+
+
+@router.get("/queries")
+async def query_statistics(
+    limit: int | None = Query(default=None, ge=1, le=1000),
+    sort: Literal["total", "mean", "max", "calls", "rows"] = "total",
+    admin: User = Depends(get_current_superuser),
+):
+    """
+    Most expensive query fingerprints of this worker (admin only).
+
+    Totals run since startup or the last reset.
+    """
+    return {"queries": [stats.as_dict() for stats in query_stats.top(limit, sort)]}
+
+
+@router.delete("/queries", status_code=204)
+async def reset_query_statistics(admin: User = Depends(get_current_superuser)):
+    """Reset the query statistics of this worker (admin only)."""
+    query_stats.reset()
+    logger.info("Query statistics reset", admin_id=admin.id)
@@ -2,17 +2,30 @@ from __future__ import annotations
 
 from typing import AsyncGenerator
 
-from fastapi import Depends, HTTPException, status
-from jose import JWTError, jwt
+from fastapi import Depends, Header, HTTPException, Request, status
+from jose import JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.config import settings
+from app.core.config import Settings, settings
 from app.core.logging import get_logger
-from app.db.session import async_session_maker
+from app.core.security import decode_token
+from app.db.session import async_session_maker, read_session
+from app.models.user import User
+from app.services.users import get_user
 
 logger = get_logger(__name__)
 
 
+def get_settings(request: Request) -> Settings:
+    """
+    FastAPI dependency that provides the settings of the serving app.
+
+    These are the settings passed to `create_app()`; use them for request
+    limits and defaults instead of the global settings.
+    """
+    return getattr(request.app.state, "settings", settings)
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     FastAPI dependency that provides a request-scoped database session.
@@ -37,8 +50,28 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    FastAPI dependency that provides a request-scoped read-only session.
+
+    The session is bound to a healthy read replica (round-robin) when
+    replicas are configured, otherwise to the primary. A client's reads
+    shortly after it committed a write also go to the primary. Use `get_db`
+    for handlers that write, and for lookups that must see the latest rows
+    (credentials, authentication).
+
+    Yields:
+        AsyncSession: A read-only database session for the request
+    """
+    async with read_session() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
 async def get_current_user_token(
-    authorization: str | None = None,
+    authorization: str | None = Header(default=None),
 ) -> dict:
     """
     Extract and verify JWT token from Authorization header.
@@ -71,15 +104,7 @@ async def get_current_user_token(
         )
 
     try:
-        payload = jwt.decode(
-            token,
-            settings.JWT_SECRET,
-            algorithms=[settings.JWT_ALGORITHM],
-        )
-        user_id: str | None = payload.get("sub")
-        if user_id is None:
-            raise ValueError("Token missing subject")
-        return payload
+        payload = decode_token(token)
     except JWTError as e:
         logger.warning("JWT verification failed", error=str(e))
         raise HTTPException(
@@ -88,46 +113,90 @@ async def get_current_user_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    if payload.get("sub") is None:
+        logger.warning("JWT verification failed", error="Token missing subject")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return payload
+
 
 async def get_current_user(
     token: dict = Depends(get_current_user_token),
-    db: AsyncSession = Depends(get_db),
-) -> dict:
+    app_settings: Settings = Depends(get_settings),
+) -> User:
     """
     Get the currently authenticated user from JWT token.
 
     This dependency:
     1. Verifies the JWT token (via get_current_user_token)
     2. Extracts the user_id from the token
-    3. Looks up the user in the database
-    4. Returns the user data
+    3. Looks up the user through the read-through user cache, whose misses
+       go through the batching user loader; rows cached longer than
+       USER_CACHE_AUTH_MAX_AGE_SECONDS are reloaded, so `is_active` and
+       `is_superuser` changes made on other workers apply quickly
+    4. Returns the user
 
     Args:
         token: Decoded JWT token from get_current_user_token
-        db: Database session from get_db
+        app_settings: Settings of the serving app
 
     Returns:
-        Dictionary with user data from token
+        The authenticated, active User
 
     Raises:
         HTTPException: If token is invalid or user not found
     """
-    user_id: str | None = token.get("sub")
-    if not user_id:
+    try:
+        user_id = int(token.get("sub"))
+    except (TypeError, ValueError):
         logger.warning("Token missing user ID")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token",
         )
 
-    # TODO: Implement actual database lookup
-    # For now, return the token payload as user
+    user = await get_user(user_id, max_age=app_settings.USER_CACHE_AUTH_MAX_AGE_SECONDS)
+    if user is None or not user.is_active:
+        logger.warning("Token user not found or inactive", user_id=user_id)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token",
+        )
+
     logger.info("User authenticated", user_id=user_id)
-    return {"user_id": user_id, **token}
+    return user
+
+
+async def get_current_superuser(
+    current_user: User = Depends(get_current_user),
+) -> User:
+    """
+    Require the authenticated user to be a superuser.
+
+    Args:
+        current_user: User from get_current_user
+
+    Returns:
+        The authenticated superuser
+
+    Raises:
+        HTTPException: If the user is not a superuser
+    """
+    if not current_user.is_superuser:
+        logger.warning("Admin access denied", user_id=current_user.id)
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required",
+        )
+    return current_user
 
 
 # Optional: Token dependency that only returns the raw token
-def get_token_from_header(authorization: str | None = None) -> str:
+def get_token_from_header(authorization: str | None = Header(default=None)) -> str:
     """
     Extract raw JWT token from Authorization header.
 
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from app.db.health import db_health
+from app.db.session import replica_router
+
+router = APIRouter(tags=["health"])
+
+
+@router.get("/healthz")
+async def healthz():
+    """
+    Liveness probe.
+
+    Never touches the database: it only proves the worker is serving.
+    """
+    return {"status": "ok"}
+
+
+@router.get("/readyz")
+async def readyz():
+    """
+    Readiness probe.
+
+    Reports the database and pool status cached by the background health
+    monitor, so probes never add load to the database. Returns 503 until
+    the first check has passed and whenever the database is unhealthy.
+    """
+    database = db_health.status()
+    ready = database["healthy"] is True
+    return JSONResponse(
+        status_code=status.HTTP_200_OK
+        if ready
+        else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": "ready" if ready else "unavailable",
+            "database": database,
+            "replicas": replica_router.status(),
+        },
+    )
@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import get_db
 from app.core.logging import get_logger
 from app.core.security import create_access_token
+from app.services import users as user_service
 
 logger = get_logger(__name__)
 
@@ -20,6 +21,12 @@ class LoginRequest(BaseModel):
     password: str
 
 
+class RegisterRequest(LoginRequest):
+    """Registration request schema."""
+
+    username: str | None = None
+
+
 class LoginResponse(BaseModel):
     """Login response schema."""
 
@@ -44,7 +51,7 @@ async def login(
 
     Args:
         credentials: User email and password
-        db: Database session
+        db: Primary database session (a replica may lag behind a new account)
 
     Returns:
         LoginResponse with access_token
@@ -54,74 +61,64 @@ async def login(
     """
     logger.info("Login attempt", email=credentials.email)
 
-    # TODO: Implement actual database lookup
-    # user = await db.execute(select(User).where(User.email == credentials.email))
-    # user = user.scalars().first()
-
-    # For demo purposes, accept any credentials
-    if not credentials.password:
+    user = await user_service.authenticate_user(
+        db, credentials.email, credentials.password
+    )
+    if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
         )
 
     # Create access token
-    access_token = create_access_token(data={"sub": "demo_user_1"})
+    access_token = create_access_token(data={"sub": str(user.id)})
 
     logger.info("User logged in", email=credentials.email)
 
     return LoginResponse(
         access_token=access_token,
         token_type="bearer",
-        user_id=1,
+        user_id=user.id,
     )
 
 
 @router.post("/register", response_model=LoginResponse)
 async def register(
-    credentials: LoginRequest,
+    credentials: RegisterRequest,
     db: AsyncSession = Depends(get_db),
 ):
     """
     Register a new user and return JWT access token.
 
     Args:
-        credentials: User email and password
+        credentials: User email, password and optional username
+            (defaults to the email address)
         db: Database session
 
     Returns:
         LoginResponse with access_token for the new user
 
     Raises:
-        HTTPException: If email already exists or validation fails
+        ConflictError: If email or username already exists
     """
     logger.info("Registration attempt", email=credentials.email)
 
-    # TODO: Implement actual user creation
-    # Check if user exists
-    # user = await db.execute(select(User).where(User.email == credentials.email))
-    # if user.scalars().first():
-    #     raise HTTPException(
-    #         status_code=status.HTTP_409_CONFLICT,
-    #         detail="Email already registered",
-    #     )
-
-    # Hash password and create user
-    # hashed_password = hash_password(credentials.password)
-    # new_user = User(email=credentials.email, hashed_password=hashed_password)
-    # db.add(new_user)
-    # await db.commit()
-    # await db.refresh(new_user)
+    user = await user_service.create_user(
+        db,
+        email=credentials.email,
+        username=credentials.username or credentials.email,
+        password=credentials.password,
+    )
 
     # Create access token
-    access_token = create_access_token(data={"sub": "new_user_1"})
+    access_token = create_access_token(data={"sub": str(user.id)})
 
     logger.info("User registered", email=credentials.email)
 
     return LoginResponse(
         access_token=access_token,
         token_type="bearer",
-        user_id=1,
+        user_id=user.id,
     )
 
 
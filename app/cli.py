@@ -1,10 +1,198 @@
+import argparse
+import asyncio
+import atexit
+import math
+import os
+import shutil
+import sys
+import tempfile
+from contextlib import nullcontext
+
 import uvicorn
 
+from app.core.config import settings
+
+
+def available_cpus() -> int:
+    """
+    CPUs this process may actually use.
+
+    Honours CPU affinity and, in a container, the cgroup v2 CPU quota, so a
+    pod limited to 2 CPUs on a 64-core node gets 2.
+    """
+    cpus = os.process_cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as cpu_max:
+            quota, period = cpu_max.read().split()
+    except (OSError, ValueError):
+        return cpus
+    if quota == "max":
+        return cpus
+    return max(1, min(cpus, math.ceil(int(quota) / int(period))))
+
+
+def _prepare_metrics_dir(workers: int) -> None:
+    """Give the workers a clean shared multiprocess metrics directory."""
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path is None:
+        if workers == 1:
+            return
+        path = settings.SERVER_METRICS_DIR
+        if not path:
+            path = tempfile.mkdtemp(prefix="prometheus-")
+            # Removed when the server (the parent of the workers) exits
+            atexit.register(shutil.rmtree, path, ignore_errors=True)
+        # Set before any worker imports prometheus_client
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = path
+
+    from app.core.metrics import prepare_multiprocess_dir
+
+    prepare_multiprocess_dir(path)
+
 
 def start() -> None:
+    """Run the API: auto-reload for development, or `--prod` for production."""
+    parser = argparse.ArgumentParser(
+        prog="start",
+        description="Run the API server (development auto-reload by default).",
+    )
+    parser.add_argument(
+        "--prod",
+        action="store_true",
+        help="Production mode: pre-forked workers, uvloop/httptools, no reload",
+    )
+    parser.add_argument("--host", default=None)
+    parser.add_argument("--port", type=int, default=None)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: SERVER_WORKERS, 0 = available CPUs)",
+    )
+    parser.add_argument("--loop", choices=["auto", "asyncio", "uvloop"])
+    parser.add_argument("--http", choices=["auto", "h11", "httptools"])
+    parser.add_argument(
+        "--limit-max-requests",
+        type=int,
+        default=None,
+        help="Recycle a worker after this many requests (0 = never)",
+    )
+    parser.add_argument("--backlog", type=int, default=None)
+    parser.add_argument("--timeout-keep-alive", type=int, default=None)
+    args = parser.parse_args()
+
+    if not args.prod:
+        uvicorn.run(
+            "app.main:app",
+            host=args.host or "127.0.0.1",
+            port=args.port or 8000,
+            reload=True,
+        )
+        return
+
+    workers = args.workers if args.workers is not None else settings.SERVER_WORKERS
+    workers = workers or available_cpus()
+    limit_max_requests = (
+        args.limit_max_requests
+        if args.limit_max_requests is not None
+        else settings.SERVER_LIMIT_MAX_REQUESTS
+    )
+    _prepare_metrics_dir(workers)
+
     uvicorn.run(
         "app.main:app",
-        host="127.0.0.1",
-        port=8000,
-        reload=True,
+        host=args.host or settings.SERVER_HOST,
+        port=args.port or settings.SERVER_PORT,
+        workers=workers,
+        loop=args.loop or settings.SERVER_LOOP,
+        http=args.http or settings.SERVER_HTTP,
+        limit_max_requests=limit_max_requests or None,
+        limit_max_requests_jitter=settings.SERVER_LIMIT_MAX_REQUESTS_JITTER,
+        backlog=args.backlog or settings.SERVER_BACKLOG,
+        timeout_keep_alive=(
+            args.timeout_keep_alive
+            if args.timeout_keep_alive is not None
+            else settings.SERVER_TIMEOUT_KEEP_ALIVE
+        ),
+        timeout_graceful_shutdown=settings.SERVER_TIMEOUT_GRACEFUL_SHUTDOWN,
+        access_log=settings.SERVER_ACCESS_LOG,
+        proxy_headers=True,
     )
+
+
+def export_users() -> None:
+    """Stream every user to stdout (or a file) as NDJSON or CSV."""
+    parser = argparse.ArgumentParser(
+        prog="export-users",
+        description="Export the users table without loading it into memory.",
+    )
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Rows per server-side cursor fetch",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(_export_users(args.format, args.output, args.batch_size))
+
+
+async def _export_users(
+    export_format: str, output: str | None, batch_size: int | None
+) -> None:
+    from app.core.logging import setup_logging
+    from app.db.session import dispose_engines, init_engine
+    from app.services.user_export import export_users as stream_users
+
+    setup_logging()
+    init_engine()
+    try:
+        with open(output, "wb") if output else nullcontext(sys.stdout.buffer) as out:
+            async for chunk in stream_users(export_format, batch_size):
+                out.write(chunk)
+    finally:
+        await dispose_engines()
+
+
+def import_users() -> None:
+    """Bulk-create users from a CSV or NDJSON file and print the report."""
+    parser = argparse.ArgumentParser(
+        prog="import-users",
+        description="Bulk import users via PostgreSQL COPY.",
+    )
+    parser.add_argument("path", help="CSV (with header) or NDJSON file")
+    parser.add_argument(
+        "--format",
+        choices=["csv", "ndjson"],
+        default=None,
+        help="Input format (default: from the file extension)",
+    )
+    args = parser.parse_args()
+
+    import_format = args.format or (
+        "ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv"
+    )
+    asyncio.run(_import_users(args.path, import_format))
+
+
+async def _import_users(path: str, import_format: str) -> None:
+    from app.core.logging import setup_logging
+    from app.db.session import dispose_engines, init_engine
+    from app.services.user_import import import_users as bulk_import
+
+    setup_logging()
+    init_engine()
+
+    async def read_chunks():
+        with open(path, "rb") as source:
+            while chunk := source.read(1 << 20):
+                yield chunk
+
+    try:
+        report = await bulk_import(read_chunks(), import_format)
+    finally:
+        await dispose_engines()
+
+    print(report.model_dump_json(indent=2))
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any
+
+import structlog
+
+# Levels as named by structlog's add_log_level
+_LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "warn": logging.WARNING,
+    "error": logging.ERROR,
+    "exception": logging.ERROR,
+    "critical": logging.CRITICAL,
+}
+
+REPORT_EVENT = "Log events suppressed"
+
+
+class _TokenBucket:
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    def take(self, now: float) -> bool:
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class EventSampler:
+    """
+    structlog processor that thins out hot log events by event name.
+
+    - `sample_rates`: keep 1 in N occurrences; kept events carry
+      `sample_rate=N` so counts can be re-weighted downstream
+    - `rate_limits`: keep at most K occurrences per second (token bucket)
+    - Events at `always_keep_level` (WARNING) or above are never dropped
+
+    Suppressed occurrences are counted per event and emitted as a
+    "Log events suppressed" record every `report_interval` seconds, so
+    true totals can be reconstructed from the logs. Must run after
+    `add_log_level`.
+    """
+
+    def __init__(
+        self,
+        sample_rates: dict[str, int],
+        rate_limits: dict[str, float],
+        report_interval: float,
+        always_keep_level: int = logging.WARNING,
+    ):
+        self.sample_rates = {event: n for event, n in sample_rates.items() if n > 1}
+        self.report_interval = report_interval
+        self.always_keep_level = always_keep_level
+        self._buckets = {
+            event: _TokenBucket(rate) for event, rate in rate_limits.items() if rate > 0
+        }
+        self._seen: dict[str, int] = {}
+        self._suppressed: dict[str, int] = {}
+        self._last_report = time.monotonic()
+        self._lock = threading.Lock()
+        self._logger = structlog.get_logger(__name__)
+
+    def __call__(
+        self, logger: Any, method_name: str, event_dict: dict[str, Any]
+    ) -> dict[str, Any]:
+        event = event_dict.get("event")
+        level = _LEVELS.get(event_dict.get("level", method_name), logging.INFO)
+        now = time.monotonic()
+
+        keep = True
+        report = None
+        with self._lock:
+            if level < self.always_keep_level and isinstance(event, str):
+                keep = self._should_keep(event, event_dict, now)
+                if not keep:
+                    self._suppressed[event] = self._suppressed.get(event, 0) + 1
+            if self._suppressed and now - self._last_report >= self.report_interval:
+                report = self._take_report(now)
+
+        # Emitted outside the lock: the report goes through this processor too
+        if report is not None:
+            self._logger.info(REPORT_EVENT, **report)
+
+        if not keep:
+            raise structlog.DropEvent
+        return event_dict
+
+    def _should_keep(self, event: str, event_dict: dict[str, Any], now: float) -> bool:
+        rate = self.sample_rates.get(event)
+        if rate is not None:
+            seen = self._seen.get(event, 0)
+            self._seen[event] = seen + 1
+            if seen % rate:
+                return False
+            event_dict["sample_rate"] = rate
+
+        bucket = self._buckets.get(event)
+        if bucket is not None and not bucket.take(now):
+            return False
+        return True
+
+    def _take_report(self, now: float) -> dict[str, Any]:
+        report = {
+            "suppressed": self._suppressed,
+            "interval_seconds": round(now - self._last_report, 3),
+        }
+        self._suppressed = {}
+        self._last_report = now
+        return report
+
+    def flush(self) -> None:
+        """Emit any pending suppressed counts immediately."""
+        with self._lock:
+            report = self._take_report(time.monotonic()) if self._suppressed else None
+        if report is not None:
+            self._logger.info(REPORT_EVENT, **report)
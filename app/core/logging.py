@@ -1,9 +1,18 @@
 from __future__ import annotations
 
+import atexit
+import functools
+import gzip
 import logging
 import logging.handlers
+import os
+import queue
+import shutil
+import sys
 from pathlib import Path
+from typing import Any
 
+import orjson
 import structlog
 from structlog.processors import (
     JSONRenderer,
@@ -13,16 +22,149 @@ from structlog.processors import (
 )
 from structlog.stdlib import LoggerFactory, ProcessorFormatter
 
-from app.core.config import settings
+from app.core.config import Settings, settings
+from app.core.log_sampling import EventSampler
+from app.core.metrics import LOG_RECORDS_DROPPED
 
+# Original value, restored when switching back from the performance profile
+_STDLIB_SRCFILE = logging._srcfile
 
-def setup_logging() -> None:
+# Installed by setup_logging; kept so it can be torn down and re-run
+_queue_handler: logging.Handler | None = None
+_listener: logging.handlers.QueueListener | None = None
+_sampler: EventSampler | None = None
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to a bounded queue drained by a QueueListener thread.
+
+    Formatting, file I/O and rotation all happen on the listener thread, so
+    logging never blocks the event loop on disk. When the queue is full the
+    overflow policy decides what happens:
+
+    - drop_new: discard the incoming record
+    - drop_oldest: discard the oldest queued record to make room
+    - block: wait for room (back-pressures the caller)
+
+    Dropped records are counted in `log_records_dropped_total`.
+    """
+
+    def __init__(self, log_queue: queue.Queue, overflow_policy: str):
+        super().__init__(log_queue)
+        self.overflow_policy = overflow_policy
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock prepare() formats the record here, on the caller's
+        # thread. Only snapshot the message so mutable args can't change
+        # before the listener formats it.
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+
+        if self.overflow_policy == "block":
+            self.queue.put(record)
+            return
+
+        if self.overflow_policy == "drop_oldest":
+            try:
+                dropped = self.queue.get_nowait()
+                LOG_RECORDS_DROPPED.labels(dropped.levelname).inc()
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(record)
+                return
+            except queue.Full:
+                pass
+
+        LOG_RECORDS_DROPPED.labels(record.levelname).inc()
+
+
+def _gzip_namer(name: str) -> str:
+    return f"{name}.gz"
+
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def _orjson_dumps(obj: Any, **kwargs: Any) -> str:
+    # orjson renders straight to bytes; stdlib handlers write text, so
+    # decode once here
+    return orjson.dumps(obj, default=str).decode()
+
+
+def _capture_exc_info(
+    logger: Any, method_name: str, event_dict: dict[str, Any]
+) -> dict[str, Any]:
+    """Resolve `exc_info=True` now; the listener thread has no exception."""
+    exc_info = event_dict.get("exc_info")
+    if exc_info is True:
+        event_dict["exc_info"] = sys.exc_info()
+    elif isinstance(exc_info, BaseException):
+        event_dict["exc_info"] = (type(exc_info), exc_info, exc_info.__traceback__)
+    return event_dict
+
+
+@functools.cache
+def _static_context() -> dict[str, str]:
+    """Fields that never change for the life of the process."""
+    return {
+        "service": settings.OTEL_SERVICE_NAME,
+        "environment": settings.ENVIRONMENT,
+        "version": settings.API_VERSION,
+    }
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _queue_handler, _listener, _sampler
+
+    if _sampler is not None:
+        _sampler.flush()
+        _sampler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+
+
+def setup_logging(settings: Settings = settings) -> None:
     """
     Configure structlog with environment-specific settings.
 
+    Called by the app lifespan (and CLI commands); importing this module
+    doesn't configure anything. Safe to call again to reconfigure.
+
     - Development: Pretty console output with colors
     - Production: JSON output to both file and console for Loki/Prometheus
+
+    The root logger only gets a BoundedQueueHandler; the file and console
+    handlers run on a QueueListener thread.
+
+    With LOG_PROFILE="performance" the request path only adds the level and
+    timestamp; exception formatting and orjson rendering run in the
+    listener's ProcessorFormatter, and callsite/stack inspection is skipped.
     """
+    global _queue_handler, _listener, _sampler
+
+    stop_logging()
+    # Registered once no matter how often logging is reconfigured
+    atexit.unregister(stop_logging)
+    atexit.register(stop_logging)
 
     # Create logs directory if it doesn't exist
     logs_dir = Path(__file__).resolve().parent.parent.parent / "logs"
@@ -38,17 +180,37 @@ def setup_logging() -> None:
     # === File Handler (always JSON for machine parsing) ===
     file_handler = logging.handlers.RotatingFileHandler(
         logs_dir / "app.log",
-        maxBytes=10_000_000,  # 10MB
-        backupCount=5,
+        maxBytes=settings.LOG_FILE_MAX_BYTES,
+        backupCount=settings.LOG_FILE_BACKUP_COUNT,
     )
     file_handler.setLevel(log_level)
+    if settings.LOG_FILE_COMPRESS:
+        file_handler.namer = _gzip_namer
+        file_handler.rotator = _gzip_rotator
 
     # === Console Handler ===
     console_handler = logging.StreamHandler()
     console_handler.setLevel(log_level)
 
-    # Choose formatter based on environment
-    if settings.DEBUG:
+    performance = settings.LOG_PROFILE == "performance"
+
+    # Choose formatter based on profile and environment
+    if performance:
+        # Render once, on the listener thread
+        formatter = ProcessorFormatter(
+            processors=[
+                ProcessorFormatter.remove_processors_meta,
+                structlog.processors.format_exc_info,
+                KeyValueRenderer()
+                if settings.DEBUG
+                else JSONRenderer(serializer=_orjson_dumps),
+            ],
+            foreign_pre_chain=[
+                add_log_level,
+                TimeStamper(fmt="iso"),
+            ],
+        )
+    elif settings.DEBUG:
         # Development: Pretty human-readable format
         formatter = logging.Formatter(
             "%(asctime)s [%(levelname)s] %(name)s: %(message)s",
@@ -67,13 +229,40 @@ def setup_logging() -> None:
     file_handler.setFormatter(formatter)
     console_handler.setFormatter(formatter)
 
-    # Add handlers to root logger
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
+    # Route root logger records through the queue to the listener thread
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    _queue_handler = BoundedQueueHandler(log_queue, settings.LOG_QUEUE_OVERFLOW_POLICY)
+    _queue_handler.setLevel(log_level)
+    root_logger.addHandler(_queue_handler)
+
+    _listener = logging.handlers.QueueListener(
+        log_queue,
+        file_handler,
+        console_handler,
+        respect_handler_level=True,
+    )
+    _listener.start()
+
+    # Skip the per-record caller/thread/process lookups the stdlib does by
+    # default (see "Optimization" in the logging HOWTO); nothing in the
+    # performance profile renders them
+    logging._srcfile = _STDLIB_SRCFILE if not performance else None
+    logging.logThreads = not performance
+    logging.logProcesses = not performance
+    logging.logMultiprocessing = not performance
+    logging.logAsyncioTasks = not performance
 
     # === Configure structlog ===
-    structlog.configure(
-        processors=[
+    if performance:
+        processors = [
+            add_log_level,
+            TimeStamper(fmt="iso"),
+            _capture_exc_info,
+            # Hand the event dict to the queue; the formatter renders it
+            ProcessorFormatter.wrap_for_formatter,
+        ]
+    else:
+        processors = [
             add_log_level,
             TimeStamper(fmt="iso"),
             structlog.processors.StackInfoRenderer(),
@@ -83,7 +272,19 @@ def setup_logging() -> None:
             structlog.processors.CallsiteParameterAdder(),
             # Choose renderer based on environment
             JSONRenderer() if not settings.DEBUG else KeyValueRenderer(),
-        ],
+        ]
+
+    # Sample hot events right after the level is known, before any other work
+    if settings.LOG_SAMPLE_RATES or settings.LOG_RATE_LIMITS:
+        _sampler = EventSampler(
+            sample_rates=settings.LOG_SAMPLE_RATES,
+            rate_limits=settings.LOG_RATE_LIMITS,
+            report_interval=settings.LOG_SAMPLING_REPORT_INTERVAL_SECONDS,
+        )
+        processors.insert(1, _sampler)
+
+    structlog.configure(
+        processors=processors,
         context_class=dict,
         logger_factory=LoggerFactory(),
         cache_logger_on_first_use=True,
@@ -100,8 +301,7 @@ def get_logger(name: str) -> structlog.BoundLogger:
     Returns:
         A structlog BoundLogger instance
     """
+    if settings.LOG_PROFILE == "performance":
+        # Bound once here instead of being added on every call
+        return structlog.get_logger(name, **_static_context())
     return structlog.get_logger(name)
-
-
-# Initialize logging on import
-setup_logging()
@@ -0,0 +1,216 @@
+"""
+Python heap tracing with tracemalloc.
+
+Tracing is off until started (it slows allocations down and each trace
+keeps `frames` frames). While it runs, named snapshots can be taken and
+diffed to find the file:line sites whose allocations grow, and an optional
+background monitor periodically logs the top growth sites and updates the
+heap gauges. Everything is per worker.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import tracemalloc
+from collections import OrderedDict
+from typing import Any
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import (
+    PYTHON_HEAP_TRACED_BYTES,
+    PYTHON_HEAP_TRACED_PEAK_BYTES,
+    TRACEMALLOC_OVERHEAD_BYTES,
+)
+
+logger = get_logger(__name__)
+
+# Allocations made by the import machinery and tracemalloc itself are noise
+_FILTERS = (
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+    tracemalloc.Filter(False, tracemalloc.__file__),
+)
+
+
+def _growth(stat: tracemalloc.StatisticDiff) -> dict[str, Any]:
+    frame = stat.traceback[0]
+    return {
+        "file": frame.filename,
+        "line": frame.lineno,
+        "size_diff": stat.size_diff,
+        "size": stat.size,
+        "count_diff": stat.count_diff,
+        "count": stat.count,
+    }
+
+
+class MemoryTracker:
+    """
+    Starts/stops tracemalloc and keeps named snapshots to diff.
+
+    At most `max_snapshots` snapshots are kept (the oldest is dropped), as
+    each one holds every live trace. Stopping tracing drops them all.
+    """
+
+    def __init__(self, frames: int, top_n: int, max_snapshots: int):
+        self.frames = frames
+        self.top_n = top_n
+        self.max_snapshots = max_snapshots
+        self._snapshots: OrderedDict[str, tracemalloc.Snapshot] = OrderedDict()
+        self._lock = threading.Lock()
+        self._monitor: asyncio.Task | None = None
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int | None = None) -> None:
+        """Start tracing, keeping `frames` frames per allocation."""
+        if self.tracing:
+            return
+        tracemalloc.start(frames or self.frames)
+        logger.info("Memory tracing started", frames=tracemalloc.get_traceback_limit())
+
+    def stop(self) -> None:
+        """Stop tracing and drop all snapshots."""
+        with self._lock:
+            self._snapshots.clear()
+        if self.tracing:
+            tracemalloc.stop()
+            for gauge in (
+                PYTHON_HEAP_TRACED_BYTES,
+                PYTHON_HEAP_TRACED_PEAK_BYTES,
+                TRACEMALLOC_OVERHEAD_BYTES,
+            ):
+                gauge.set(0)
+            logger.info("Memory tracing stopped")
+
+    def status(self) -> dict[str, Any]:
+        """Tracing state, heap sizes and snapshot names; refreshes the gauges."""
+        if not self.tracing:
+            return {"tracing": False, "snapshots": []}
+        traced, peak = self.update_gauges()
+        with self._lock:
+            names = list(self._snapshots)
+        return {
+            "tracing": True,
+            "frames": tracemalloc.get_traceback_limit(),
+            "traced_bytes": traced,
+            "peak_bytes": peak,
+            "overhead_bytes": tracemalloc.get_tracemalloc_memory(),
+            "snapshots": names,
+        }
+
+    def update_gauges(self) -> tuple[int, int]:
+        traced, peak = tracemalloc.get_traced_memory()
+        PYTHON_HEAP_TRACED_BYTES.set(traced)
+        PYTHON_HEAP_TRACED_PEAK_BYTES.set(peak)
+        TRACEMALLOC_OVERHEAD_BYTES.set(tracemalloc.get_tracemalloc_memory())
+        return traced, peak
+
+    def _take(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(_FILTERS)
+
+    def take_snapshot(self, name: str) -> None:
+        """
+        Take a snapshot and store it as `name`, replacing any older one.
+
+        Slow (proportional to the number of live traces); call it off the
+        event loop.
+        """
+        snapshot = self._take()
+        with self._lock:
+            self._snapshots.pop(name, None)
+            self._snapshots[name] = snapshot
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+
+    def diff(
+        self, base: str, against: str | None = None, limit: int | None = None
+    ) -> list[dict[str, Any]]:
+        """
+        Top allocation changes by file and line between two snapshots.
+
+        Args:
+            base: Name of the older snapshot
+            against: Name of the newer snapshot (a fresh one when None)
+            limit: Number of sites to return (default `top_n`)
+
+        Returns:
+            Sites sorted by absolute size change
+
+        Raises:
+            KeyError: With the name of a snapshot that doesn't exist
+        """
+        with self._lock:
+            old = self._snapshots[base]
+            new = self._snapshots[against] if against is not None else None
+        if new is None:
+            new = self._take()
+        stats = new.compare_to(old, "lineno")
+        return [_growth(stat) for stat in stats[: limit or self.top_n]]
+
+    def _top_growth(
+        self, new: tracemalloc.Snapshot, old: tracemalloc.Snapshot
+    ) -> list[dict[str, Any]]:
+        stats = sorted(
+            new.compare_to(old, "lineno"), key=lambda stat: stat.size_diff, reverse=True
+        )
+        return [_growth(stat) for stat in stats[: self.top_n] if stat.size_diff > 0]
+
+    def start_monitor(self, interval: float) -> None:
+        """Start tracing and log the top growth sites every `interval` seconds."""
+        if self._monitor is not None:
+            return
+        self.start()
+        self._monitor = asyncio.get_running_loop().create_task(
+            self._run_monitor(interval)
+        )
+
+    async def stop_monitor(self) -> None:
+        if self._monitor is None:
+            return
+        self._monitor.cancel()
+        try:
+            await self._monitor
+        except asyncio.CancelledError:
+            pass
+        self._monitor = None
+
+    async def _run_monitor(self, interval: float) -> None:
+        previous: tracemalloc.Snapshot | None = None
+        while True:
+            await asyncio.sleep(interval)
+            if not self.tracing:
+                # Stopped through the API; wait until it is started again
+                previous = None
+                continue
+            try:
+                snapshot = await run_in_threadpool(self._take)
+                traced, peak = self.update_gauges()
+                if previous is not None:
+                    growth = await run_in_threadpool(
+                        self._top_growth, snapshot, previous
+                    )
+                    logger.info(
+                        "Memory growth",
+                        traced_bytes=traced,
+                        peak_bytes=peak,
+                        interval_seconds=interval,
+                        top=growth,
+                    )
+                previous = snapshot
+            except Exception:
+                logger.exception("Memory monitor run failed")
+
+
+memory_tracker = MemoryTracker(
+    frames=settings.MEMORY_TRACE_FRAMES,
+    top_n=settings.MEMORY_TRACE_TOP_N,
+    max_snapshots=settings.MEMORY_TRACE_MAX_SNAPSHOTS,
+)
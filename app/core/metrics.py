@@ -1,5 +1,53 @@
 # app/metrics.py
-from prometheus_client import Counter, Histogram
+"""
+Prometheus metrics.
+
+With several workers per pod, set PROMETHEUS_MULTIPROC_DIR in the
+environment of every worker (it must be set before prometheus_client is
+imported) so each process writes its values to mmap'd files in that
+directory and /metrics aggregates them across workers. The directory
+should be emptied once before the workers start (see
+`prepare_multiprocess_dir`); gauges declare how per-worker values combine
+via `multiprocess_mode`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import os
+import re
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.openmetrics.exposition import (
+    CONTENT_TYPE_LATEST as OPENMETRICS_CONTENT_TYPE,
+)
+from prometheus_client.openmetrics.exposition import (
+    generate_latest as openmetrics_generate_latest,
+)
+from prometheus_client.registry import Collector
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR") or os.environ.get(
+    "prometheus_multiproc_dir"
+)
+if MULTIPROC_DIR:
+    # Must exist before the first metric below is constructed
+    os.makedirs(MULTIPROC_DIR, exist_ok=True)
 
 HTTP_REQUESTS = Counter(
     "http_requests_total",
@@ -10,5 +58,312 @@ HTTP_REQUESTS = Counter(
 HTTP_LATENCY = Histogram(
     "http_request_duration_seconds",
     "HTTP request latency",
+    ["method", "path"],
+    buckets=settings.HTTP_LATENCY_BUCKETS,
+)
+
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being handled",
+    multiprocess_mode="livesum",
+)
+
+_SIZE_BUCKETS = (0, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+
+HTTP_REQUEST_SIZE = Histogram(
+    "http_request_size_bytes",
+    "HTTP request body size",
+    ["path"],
+    buckets=_SIZE_BUCKETS,
+)
+
+HTTP_RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "HTTP response body size",
     ["path"],
+    buckets=_SIZE_BUCKETS,
+)
+
+METRICS_RENDER_DURATION = Histogram(
+    "metrics_render_duration_seconds",
+    "Time spent rendering (and compressing) the /metrics exposition",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+PASSWORD_HASH_QUEUE_DEPTH = Gauge(
+    "password_hash_queue_depth",
+    "Password hash/verify jobs submitted to the worker pool and not yet finished",
+    ["operation"],
+    multiprocess_mode="livesum",
 )
+
+JWT_CACHE_LOOKUPS = Counter(
+    "jwt_cache_lookups_total",
+    "Verified-JWT cache lookups",
+    ["result"],
+)
+
+USER_LOADER_BATCH_SIZE = Histogram(
+    "user_loader_batch_size",
+    "Distinct user ids fetched per batched lookup query",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250),
+)
+
+USER_CACHE_LOOKUPS = Counter(
+    "user_cache_lookups_total",
+    "Read-through User cache lookups",
+    ["result"],
+)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Connections currently checked out of the pool",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_connections",
+    "Overflow connections (beyond pool_size) currently open",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting to check a connection out of the pool",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1, 5, 30),
+)
+
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after the pool timeout",
+    ["pool"],
+)
+
+DB_POOL_CONNECTION_AGE = Histogram(
+    "db_pool_connection_age_seconds",
+    "Age of connections when they are checked out",
+    ["pool"],
+    buckets=(1, 10, 60, 300, 900, 1800, 3600, 7200, 14400, 43200),
+)
+
+OTEL_SPAN_QUEUE_SIZE = Gauge(
+    "otel_span_queue_size",
+    "Sampled spans waiting in the BatchSpanProcessor queue",
+    multiprocess_mode="livesum",
+)
+
+OTEL_SPANS_DROPPED = Counter(
+    "otel_spans_dropped_total",
+    "Sampled spans dropped because the span queue was full",
+)
+
+OTEL_SPANS_EXPORTED = Counter(
+    "otel_spans_exported_total",
+    "Spans handed to the trace exporter, by export result",
+    ["result"],
+)
+
+OTEL_SPAN_EXPORT_DURATION = Histogram(
+    "otel_span_export_duration_seconds",
+    "Time taken to export one batch of spans",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop ran a periodic probe callback",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+EVENT_LOOP_STALLS = Counter(
+    "event_loop_stalls_total",
+    "Event loop stalls longer than the watchdog threshold",
+)
+
+PYTHON_HEAP_TRACED_BYTES = Gauge(
+    "python_heap_traced_bytes",
+    "Python heap currently allocated, as traced by tracemalloc",
+    multiprocess_mode="liveall",
+)
+
+PYTHON_HEAP_TRACED_PEAK_BYTES = Gauge(
+    "python_heap_traced_peak_bytes",
+    "Peak traced Python heap since tracing started",
+    multiprocess_mode="liveall",
+)
+
+TRACEMALLOC_OVERHEAD_BYTES = Gauge(
+    "tracemalloc_overhead_bytes",
+    "Memory used by tracemalloc to store traces",
+    multiprocess_mode="liveall",
+)
+
+LOG_RECORDS_DROPPED = Counter(
+    "log_records_dropped_total",
+    "Log records dropped because the log queue was full",
+    ["level"],
+)
+
+
+# Collectors of in-process state, which has no multiprocess file backing
+_process_collectors: list[Collector] = []
+
+
+def register_process_collector(collector: Collector) -> None:
+    """
+    Export a custom collector of this process's state.
+
+    In multiprocess mode it is added to each scrape's registry, so a scrape
+    reports the values of the worker that serves it.
+    """
+    if MULTIPROC_DIR:
+        _process_collectors.append(collector)
+    else:
+        REGISTRY.register(collector)
+
+
+# Live gauge files are named e.g. "gauge_livesum_1234.db"
+_PID_RE = re.compile(r"_(\d+)\.db$")
+
+
+def prepare_multiprocess_dir(path: str) -> None:
+    """
+    Create `path` and remove metric files left over from a previous run.
+
+    Only the `*.db` metric files directly in `path` are deleted, so a
+    directory shared with anything else keeps its other contents. Call once
+    from the parent process before any worker starts; clearing it later
+    would reset counters that live workers are still writing.
+    """
+    os.makedirs(path, exist_ok=True)
+    for file in Path(path).glob("*.db"):
+        if file.is_file():
+            file.unlink(missing_ok=True)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def cleanup_dead_workers() -> list[int]:
+    """
+    Mark workers whose process is gone as dead.
+
+    Drops their "live*" gauge files so in-flight/pool gauges stop counting
+    them. Counter and histogram files are kept so totals don't go
+    backwards when a worker is replaced.
+
+    Returns:
+        The pids that were cleaned up (empty outside multiprocess mode)
+    """
+    if not MULTIPROC_DIR:
+        return []
+
+    dead = set()
+    for file in Path(MULTIPROC_DIR).glob("gauge_live*.db"):
+        match = _PID_RE.search(file.name)
+        if match and not _pid_alive(int(match.group(1))):
+            dead.add(int(match.group(1)))
+    for pid in dead:
+        multiprocess.mark_process_dead(pid, MULTIPROC_DIR)
+    return sorted(dead)
+
+
+def mark_worker_dead() -> None:
+    """Remove this worker's live gauges; call on shutdown."""
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid(), MULTIPROC_DIR)
+
+
+def render_metrics(openmetrics: bool = False) -> tuple[bytes, str]:
+    """
+    Render the exposition for a scrape.
+
+    In multiprocess mode the values of every worker are aggregated from
+    MULTIPROC_DIR; otherwise the default registry of this process is used.
+
+    Args:
+        openmetrics: Use the OpenMetrics text format, the only one that
+            carries exemplars (not recorded in multiprocess mode)
+
+    Returns:
+        The encoded exposition and its content type
+    """
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry, path=MULTIPROC_DIR)
+        for collector in _process_collectors:
+            registry.register(collector)
+    else:
+        registry = REGISTRY
+
+    if openmetrics:
+        return openmetrics_generate_latest(registry), OPENMETRICS_CONTENT_TYPE
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class Exposition(NamedTuple):
+    content: bytes
+    gzipped: bytes
+    content_type: str
+
+
+def _render_exposition(openmetrics: bool) -> Exposition:
+    started = time.perf_counter()
+    content, content_type = render_metrics(openmetrics)
+    exposition = Exposition(
+        content, gzip.compress(content, compresslevel=6), content_type
+    )
+    METRICS_RENDER_DURATION.observe(time.perf_counter() - started)
+    return exposition
+
+
+class ExpositionCache:
+    """
+    Reuses the rendered /metrics output for `ttl` seconds.
+
+    Rendering runs on the threadpool, off the event loop, and concurrent
+    scrapes that miss the cache wait for the same render instead of each
+    starting their own. The gzip encoding is produced alongside it. Each
+    format (Prometheus text, OpenMetrics) is cached separately.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._expositions: dict[bool, tuple[float, Exposition]] = {}
+        self._inflight: dict[bool, asyncio.Task[Exposition]] = {}
+
+    async def get(self, openmetrics: bool = False) -> Exposition:
+        """Get the current exposition, rendering it if the cached one expired."""
+        entry = self._expositions.get(openmetrics)
+        if entry is not None and time.monotonic() < entry[0]:
+            return entry[1]
+
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(openmetrics)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(self._render(openmetrics))
+            self._inflight[openmetrics] = task
+        return await asyncio.shield(task)
+
+    async def _render(self, openmetrics: bool) -> Exposition:
+        try:
+            exposition = await run_in_threadpool(_render_exposition, openmetrics)
+        finally:
+            if self._inflight.get(openmetrics) is asyncio.current_task():
+                del self._inflight[openmetrics]
+
+        self._expositions[openmetrics] = (time.monotonic() + self.ttl, exposition)
+        return exposition
+
+
+exposition_cache = ExpositionCache(ttl=settings.METRICS_CACHE_SECONDS)
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import math
+import time
+from typing import TYPE_CHECKING
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import (
+    HTTP_LATENCY,
+    HTTP_REQUEST_SIZE,
+    HTTP_REQUESTS,
+    HTTP_REQUESTS_IN_FLIGHT,
+    HTTP_RESPONSE_SIZE,
+)
+from app.core.telemetry import current_trace_exemplar
+
+if TYPE_CHECKING:
+    from app.db.session import ReplicaRouter
+
+# Cookie carrying a client's read-after-write pin between requests and workers
+READ_YOUR_WRITES_COOKIE = "primary_until"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording Prometheus HTTP metrics.
+
+    Unlike `@app.middleware("http")` (BaseHTTPMiddleware) this doesn't run
+    the app in a separate task or re-stream the response: `receive` and
+    `send` are wrapped only to count body bytes and capture the status
+    code, and messages are passed through untouched.
+
+    Metrics are labelled by route template (e.g. "/api/v1/users/{user_id}")
+    which the router leaves in `scope["route"]`; unmatched requests are
+    labelled "unknown". Latency observations carry the current trace id as
+    an exemplar when METRICS_EXEMPLARS is on; this relies on the
+    OpenTelemetry middleware wrapping this one so its span is still active.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        request_size = 0
+        response_size = 0
+
+        async def receive_wrapper() -> Message:
+            nonlocal request_size
+            message = await receive()
+            if message["type"] == "http.request":
+                request_size += len(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unknown"
+
+            HTTP_REQUESTS.labels(scope["method"], path, status_code).inc()
+            exemplar = current_trace_exemplar() if settings.METRICS_EXEMPLARS else None
+            HTTP_LATENCY.labels(scope["method"], path).observe(
+                duration, exemplar=exemplar
+            )
+            HTTP_REQUEST_SIZE.labels(path).observe(request_size)
+            HTTP_RESPONSE_SIZE.labels(path).observe(response_size)
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pure ASGI middleware scoping replica read-after-write to the client.
+
+    Each request runs inside `router.read_your_writes()`, seeded from the
+    `primary_until` cookie. When the request commits a write, the response
+    sets the cookie to the end of the read-after-write window, so the
+    client's next requests read from the primary on whichever worker they
+    land. A no-op while the router has no replicas.
+    """
+
+    def __init__(self, app: ASGIApp, router: ReplicaRouter):
+        self.app = app
+        self.router = router
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.router.replicas:
+            await self.app(scope, receive, send)
+            return
+
+        cookie = HTTPConnection(scope).cookies.get(READ_YOUR_WRITES_COOKIE)
+        try:
+            primary_until = float(cookie) if cookie else 0.0
+        except ValueError:
+            primary_until = 0.0
+
+        with self.router.read_your_writes(primary_until) as client:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start" and client.wrote:
+                    max_age = math.ceil(self.router.read_after_write)
+                    MutableHeaders(scope=message).append(
+                        "set-cookie",
+                        f"{READ_YOUR_WRITES_COOKIE}={client.primary_until:.3f}; "
+                        f"Max-Age={max_age}; Path=/; HttpOnly; SameSite=lax",
+                    )
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,119 @@
+"""
+In-process statistical profiler.
+
+Samples the stacks of every thread via `sys._current_frames()` from a
+background thread and aggregates them as collapsed stacks
+("frame;frame;frame count" lines), the input format of flamegraph.pl,
+speedscope and similar tools. Only the worker that serves the request is
+profiled.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from types import FrameType
+
+from app.core.config import settings
+from app.core.watchdog import find_request
+
+# Deepest stack recorded per sample; deeper frames are cut at the root side
+MAX_STACK_DEPTH = 128
+
+
+@dataclass
+class Profile:
+    stacks: Counter[str]
+    samples: int
+    duration: float
+    overhead: float
+
+    def collapsed(self) -> str:
+        """Collapsed stacks, most frequent first."""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+
+def _collapse(frame: FrameType | None, thread_name: str) -> str:
+    frames = []
+    request = find_request(frame)
+    while frame is not None and len(frames) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        frames.append(f"{code.co_qualname} ({code.co_filename}:{frame.f_lineno})")
+        frame = frame.f_back
+    frames.append(f"thread:{thread_name}")
+    if request is not None:
+        frames.append(f"route:{request['method']} {request['route']}")
+    return ";".join(reversed(frames))
+
+
+class SamplingProfiler:
+    """
+    Samples all threads every `interval` seconds, one profile at a time.
+
+    Sampling holds the GIL, so its cost is paid by the app: after each
+    sample the profiler sleeps long enough that time spent sampling stays
+    below `max_overhead` (a fraction of wall time), lowering the sample
+    rate on processes with many threads or deep stacks.
+    """
+
+    def __init__(self, interval: float, max_overhead: float):
+        self.interval = interval
+        self.max_overhead = max_overhead
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def profile(self, seconds: float) -> Profile | None:
+        """
+        Sample for `seconds` on the calling thread (which isn't sampled).
+
+        Returns:
+            The profile, or None if another profile is already running
+        """
+        if not self._lock.acquire(blocking=False):
+            return None
+        try:
+            return self._sample(seconds)
+        finally:
+            self._lock.release()
+
+    def _sample(self, seconds: float) -> Profile:
+        own_id = threading.get_ident()
+        stacks: Counter[str] = Counter()
+        samples = 0
+        sampling_time = 0.0
+        started = time.perf_counter()
+        deadline = started + seconds
+
+        while (now := time.perf_counter()) < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    stacks[_collapse(frame, names.get(thread_id, str(thread_id)))] += 1
+            samples += 1
+
+            cost = time.perf_counter() - now
+            sampling_time += cost
+            pause = max(self.interval - cost, cost / self.max_overhead - cost)
+            time.sleep(min(pause, max(0.0, deadline - time.perf_counter())))
+
+        duration = time.perf_counter() - started
+        return Profile(
+            stacks=stacks,
+            samples=samples,
+            duration=duration,
+            overhead=sampling_time / duration if duration else 0.0,
+        )
+
+
+profiler = SamplingProfiler(
+    interval=settings.DEBUG_PROFILE_INTERVAL_MS / 1000,
+    max_overhead=settings.DEBUG_PROFILE_MAX_OVERHEAD,
+)
@@ -1,15 +1,85 @@
 from __future__ import annotations
 
+import asyncio
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, Callable
 
-from jose import jwt
+from jose import JWTError, jwt
+from passlib.context import CryptContext
 
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.core.metrics import JWT_CACHE_LOOKUPS, PASSWORD_HASH_QUEUE_DEPTH
 
 logger = get_logger(__name__)
 
+# Shared bcrypt context - building a CryptContext is expensive, so do it once
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+class TokenCache:
+    """
+    Bounded LRU of verified JWT payloads.
+
+    Entries are keyed by a digest of the token (never the token itself) and
+    expire at the token's `exp` claim, capped by `max_ttl` seconds.
+    """
+
+    def __init__(self, max_size: int, max_ttl: float):
+        self.max_size = max_size
+        self.max_ttl = max_ttl
+        self._entries: OrderedDict[bytes, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: bytes) -> dict[str, Any] | None:
+        """Return the cached payload for `key`, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def put(self, key: bytes, payload: dict[str, Any]) -> None:
+        """Cache a verified payload until its expiry."""
+        expires_at = time.time() + self.max_ttl
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, float(exp))
+
+        with self._lock:
+            self._entries[key] = (expires_at, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached payloads."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+token_cache = TokenCache(
+    max_size=settings.JWT_CACHE_MAX_SIZE,
+    max_ttl=settings.JWT_CACHE_MAX_TTL_SECONDS,
+)
+
+# Worker pool for bcrypt, created lazily on first async hash/verify
+_password_executor: Executor | None = None
+
 
 def create_access_token(
     data: dict[str, Any],
@@ -51,9 +121,24 @@ def create_access_token(
     return encoded_jwt
 
 
-def verify_token(token: str) -> dict[str, Any]:
+@functools.lru_cache(maxsize=4)
+def _token_cache_key_material(secret: str, algorithm: str) -> bytes:
+    """Derive the digest key from the signing config, so rotation misses."""
+    return hashlib.sha256(f"{algorithm}:{secret}".encode()).digest()
+
+
+def _token_cache_key(token: str) -> bytes:
+    key = _token_cache_key_material(settings.JWT_SECRET, settings.JWT_ALGORITHM)
+    return hashlib.blake2b(token.encode(), key=key, digest_size=32).digest()
+
+
+def decode_token(token: str) -> dict[str, Any]:
     """
-    Verify and decode a JWT token.
+    Decode and verify a JWT token, reusing earlier verifications.
+
+    The cache key is a digest of the token keyed by the current
+    `JWT_SECRET`/`JWT_ALGORITHM`, so rotating the secret invalidates every
+    cached entry without an explicit flush.
 
     Args:
         token: JWT token string
@@ -64,15 +149,44 @@ def verify_token(token: str) -> dict[str, Any]:
     Raises:
         JWTError: If token is invalid or expired
     """
-    from jose import JWTError
-
-    try:
-        payload = jwt.decode(
+    if token_cache.max_size <= 0:
+        return jwt.decode(
             token,
             settings.JWT_SECRET,
             algorithms=[settings.JWT_ALGORITHM],
         )
-        return payload
+
+    key = _token_cache_key(token)
+    payload = token_cache.get(key)
+    if payload is not None:
+        JWT_CACHE_LOOKUPS.labels("hit").inc()
+        return dict(payload)
+
+    JWT_CACHE_LOOKUPS.labels("miss").inc()
+    payload = jwt.decode(
+        token,
+        settings.JWT_SECRET,
+        algorithms=[settings.JWT_ALGORITHM],
+    )
+    token_cache.put(key, payload)
+    return dict(payload)
+
+
+def verify_token(token: str) -> dict[str, Any]:
+    """
+    Verify and decode a JWT token.
+
+    Args:
+        token: JWT token string
+
+    Returns:
+        Decoded token payload as dictionary
+
+    Raises:
+        JWTError: If token is invalid or expired
+    """
+    try:
+        return decode_token(token)
     except JWTError as e:
         logger.warning("Token verification failed", error=str(e))
         raise
@@ -82,15 +196,15 @@ def hash_password(password: str) -> str:
     """
     Hash a password using bcrypt.
 
+    This is CPU-bound and blocks for hundreds of milliseconds. From async
+    code use `hash_password_async` instead.
+
     Args:
         password: Plain text password
 
     Returns:
         Hashed password
     """
-    from passlib.context import CryptContext
-
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
     return pwd_context.hash(password)
 
 
@@ -98,6 +212,9 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a plain password against its hash.
 
+    This is CPU-bound and blocks for hundreds of milliseconds. From async
+    code use `verify_password_async` instead.
+
     Args:
         plain_password: Plain text password
         hashed_password: Hashed password from database
@@ -105,7 +222,87 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         True if password matches, False otherwise
     """
-    from passlib.context import CryptContext
-
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
     return pwd_context.verify(plain_password, hashed_password)
+
+
+def get_password_executor() -> Executor:
+    """
+    Get the bounded worker pool used for password hashing.
+
+    The pool type and size come from `PASSWORD_HASH_EXECUTOR` and
+    `PASSWORD_HASH_MAX_WORKERS`. bcrypt releases the GIL, so threads are
+    usually enough; processes isolate hashing from the worker entirely.
+
+    Returns:
+        The shared executor instance
+    """
+    global _password_executor
+
+    if _password_executor is None:
+        if settings.PASSWORD_HASH_EXECUTOR == "process":
+            _password_executor = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_MAX_WORKERS,
+            )
+        else:
+            _password_executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_MAX_WORKERS,
+                thread_name_prefix="password-hash",
+            )
+        logger.info(
+            "Password hashing pool started",
+            executor=settings.PASSWORD_HASH_EXECUTOR,
+            max_workers=settings.PASSWORD_HASH_MAX_WORKERS,
+        )
+
+    return _password_executor
+
+
+def shutdown_password_executor() -> None:
+    """Shut down the password hashing pool, waiting for running jobs."""
+    global _password_executor
+
+    if _password_executor is not None:
+        _password_executor.shutdown(wait=True, cancel_futures=True)
+        _password_executor = None
+
+
+async def _run_in_password_pool(
+    operation: str, func: Callable[..., Any], *args: Any
+) -> Any:
+    """Run a blocking bcrypt call on the worker pool, tracking queue depth."""
+    queue_depth = PASSWORD_HASH_QUEUE_DEPTH.labels(operation)
+    queue_depth.inc()
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_password_executor(), func, *args)
+    finally:
+        queue_depth.dec()
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password using bcrypt without blocking the event loop.
+
+    Args:
+        password: Plain text password
+
+    Returns:
+        Hashed password
+    """
+    return await _run_in_password_pool("hash", hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a plain password against its hash without blocking the event loop.
+
+    Args:
+        plain_password: Plain text password
+        hashed_password: Hashed password from database
+
+    Returns:
+        True if password matches, False otherwise
+    """
+    return await _run_in_password_pool(
+        "verify", verify_password, plain_password, hashed_password
+    )
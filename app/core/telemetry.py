@@ -1,16 +1,66 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Sequence
+
 from opentelemetry import trace
-from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
-from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
-from opentelemetry.instrumentation.requests import RequestsInstrumentor
 
-from app.core.config import settings
+from app.core.config import Settings, settings
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Set once by setup_telemetry; the tracer provider can't be replaced
+_configured = False
+
+
+def current_trace_exemplar() -> dict[str, str] | None:
+    """
+    Exemplar labels linking a metric observation to the current trace.
+
+    Returns:
+        {"trace_id": <32 hex chars>} if a sampled span is active, else None
+    """
+    span_context = trace.get_current_span().get_span_context()
+    if not span_context.is_valid or not span_context.trace_flags.sampled:
+        return None
+    return {"trace_id": trace.format_trace_id(span_context.trace_id)}
+
+
+def setup_telemetry(
+    settings: Settings = settings, engines: Sequence[AsyncEngine] = ()
+) -> None:
+    """
+    Initialize OpenTelemetry with tracing to Tempo.
 
+    The SDK, exporter and instrumentors are imported here rather than at
+    module import, so they only cost anything when tracing is enabled.
+    Only the first call has an effect.
+
+    Args:
+        settings: Settings to read the exporter and sampler options from
+        engines: Engines to trace SQL statements for (all engines created
+            afterwards when empty)
+    """
+    global _configured
+
+    if _configured:
+        return
+    _configured = True
+
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+        OTLPSpanExporter,
+    )
+    from opentelemetry.instrumentation.requests import RequestsInstrumentor
+    from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+
+    from app.core.tracing import (
+        ErrorTraceProcessor,
+        InstrumentedBatchSpanProcessor,
+        build_sampler,
+    )
 
-def setup_telemetry():
-    """Initialize OpenTelemetry with tracing to Tempo."""
     # Create resource with service identification
     resource = Resource.create(
         {
@@ -21,18 +71,37 @@ def setup_telemetry():
     )
 
     # Set up trace provider
-    provider = TracerProvider(resource=resource)
+    sampler = build_sampler(
+        ratio=settings.OTEL_TRACES_SAMPLE_RATIO,
+        route_ratios=settings.OTEL_TRACES_ROUTE_SAMPLE_RATIOS,
+        always_sample_errors=settings.OTEL_TRACES_ALWAYS_SAMPLE_ERRORS,
+    )
+    provider = TracerProvider(resource=resource, sampler=sampler)
 
     # Configure OTLP exporter (only if enabled)
     if settings.OTEL_TRACES_EXPORTER == "otlp":
         exporter = OTLPSpanExporter(
             endpoint=f"{settings.OTEL_EXPORTER_OTLP_ENDPOINT}/v1/traces"
         )
-        provider.add_span_processor(BatchSpanProcessor(exporter))
+        processor = InstrumentedBatchSpanProcessor(
+            exporter,
+            max_queue_size=settings.OTEL_BSP_MAX_QUEUE_SIZE,
+            schedule_delay_millis=settings.OTEL_BSP_SCHEDULE_DELAY_MILLIS,
+            max_export_batch_size=settings.OTEL_BSP_MAX_EXPORT_BATCH_SIZE,
+            export_timeout_millis=settings.OTEL_BSP_EXPORT_TIMEOUT_MILLIS,
+        )
+        if settings.OTEL_TRACES_ALWAYS_SAMPLE_ERRORS:
+            processor = ErrorTraceProcessor(processor)
+        provider.add_span_processor(processor)
 
     # Set global tracer provider
     trace.set_tracer_provider(provider)
 
     # Auto-instrument libraries
-    SQLAlchemyInstrumentor().instrument()
+    if engines:
+        SQLAlchemyInstrumentor().instrument(
+            engines=[engine.sync_engine for engine in engines]
+        )
+    else:
+        SQLAlchemyInstrumentor().instrument()
     RequestsInstrumentor().instrument()
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Sequence
+
+from opentelemetry.context import Context
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    SpanExporter,
+    SpanExportResult,
+)
+from opentelemetry.sdk.trace.sampling import (
+    Decision,
+    ParentBased,
+    Sampler,
+    SamplingResult,
+    TraceIdRatioBased,
+)
+from opentelemetry.trace import SpanContext, StatusCode, TraceFlags, get_current_span
+
+from app.core.metrics import (
+    OTEL_SPAN_EXPORT_DURATION,
+    OTEL_SPAN_QUEUE_SIZE,
+    OTEL_SPANS_DROPPED,
+    OTEL_SPANS_EXPORTED,
+)
+
+# Unsampled traces held back by ErrorTraceProcessor until their root ends
+MAX_BUFFERED_TRACES = 1024
+MAX_BUFFERED_SPANS_PER_TRACE = 256
+
+
+class RouteRatioSampler(Sampler):
+    """
+    Root sampler: trace a ratio of requests, with per-path overrides.
+
+    The path comes from the server span attributes set by the ASGI
+    instrumentation (the route template isn't known yet when the span
+    starts). A path overridden with ratio 0 is never traced. Otherwise, when
+    `record_unsampled` is set, spans that lose the coin flip are still
+    recorded (RECORD_ONLY) so ErrorTraceProcessor can export them if the
+    request fails.
+    """
+
+    def __init__(
+        self,
+        ratio: float,
+        route_ratios: dict[str, float],
+        record_unsampled: bool,
+    ):
+        self.default = TraceIdRatioBased(ratio)
+        self.routes = {path: TraceIdRatioBased(r) for path, r in route_ratios.items()}
+        self.record_unsampled = record_unsampled
+
+    def should_sample(
+        self,
+        parent_context: Context | None,
+        trace_id: int,
+        name: str,
+        kind=None,
+        attributes=None,
+        links=None,
+        trace_state=None,
+    ) -> SamplingResult:
+        sampler = self.default
+        if attributes:
+            path = attributes.get("url.path") or attributes.get("http.target")
+            if isinstance(path, str):
+                sampler = self.routes.get(path.split("?", 1)[0], self.default)
+
+        result = sampler.should_sample(
+            parent_context, trace_id, name, kind, attributes, links, trace_state
+        )
+        never = sampler is not self.default and sampler.rate == 0
+        if result.decision is Decision.DROP and self.record_unsampled and not never:
+            return SamplingResult(Decision.RECORD_ONLY, attributes, result.trace_state)
+        return result
+
+    def get_description(self) -> str:
+        return f"RouteRatioSampler{{{self.default.rate}, routes={len(self.routes)}}}"
+
+
+class _RecordIfParentRecording(Sampler):
+    """Children of an unsampled span: record them only if the parent is."""
+
+    def should_sample(
+        self,
+        parent_context: Context | None,
+        trace_id: int,
+        name: str,
+        kind=None,
+        attributes=None,
+        links=None,
+        trace_state=None,
+    ) -> SamplingResult:
+        parent = get_current_span(parent_context)
+        decision = Decision.RECORD_ONLY if parent.is_recording() else Decision.DROP
+        return SamplingResult(
+            decision, attributes, parent.get_span_context().trace_state
+        )
+
+    def get_description(self) -> str:
+        return "RecordIfParentRecording"
+
+
+def build_sampler(
+    ratio: float, route_ratios: dict[str, float], always_sample_errors: bool
+) -> Sampler:
+    """
+    Parent-based sampler for the tracer provider.
+
+    Sampled parents are always followed. Local unsampled parents that are
+    still recording (see RouteRatioSampler) keep their children recorded, so
+    a failing request can be exported as a whole trace. That records spans
+    for every request, sampled or not, so `always_sample_errors` costs
+    close to tracing all traffic (only the export is saved).
+    """
+    root = RouteRatioSampler(ratio, route_ratios, record_unsampled=always_sample_errors)
+    if not always_sample_errors:
+        return ParentBased(root)
+    return ParentBased(root, local_parent_not_sampled=_RecordIfParentRecording())
+
+
+def _as_sampled(span: ReadableSpan) -> ReadableSpan:
+    context = span.context
+    return ReadableSpan(
+        name=span.name,
+        context=SpanContext(
+            context.trace_id,
+            context.span_id,
+            is_remote=False,
+            trace_flags=TraceFlags(TraceFlags.SAMPLED),
+            trace_state=context.trace_state,
+        ),
+        parent=span.parent,
+        resource=span.resource,
+        attributes=span.attributes,
+        events=span.events,
+        links=span.links,
+        kind=span.kind,
+        status=span.status,
+        start_time=span.start_time,
+        end_time=span.end_time,
+        instrumentation_scope=span.instrumentation_scope,
+    )
+
+
+class ErrorTraceProcessor(SpanProcessor):
+    """
+    Forwards sampled spans, plus unsampled traces that contain an error.
+
+    Recorded-but-unsampled spans are buffered per trace until the local root
+    span ends; if any of them has an ERROR status the whole buffer is passed
+    on as sampled copies, otherwise it is discarded. Buffers are bounded
+    (oldest traces are evicted).
+    """
+
+    def __init__(self, delegate: SpanProcessor):
+        self.delegate = delegate
+        self._traces: OrderedDict[int, tuple[list[ReadableSpan], bool]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def on_start(self, span: Span, parent_context: Context | None = None) -> None:
+        self.delegate.on_start(span, parent_context=parent_context)
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if span.context.trace_flags.sampled:
+            self.delegate.on_end(span)
+            return
+
+        trace_id = span.context.trace_id
+        failed = span.status.status_code is StatusCode.ERROR
+        is_local_root = span.parent is None or span.parent.is_remote
+        with self._lock:
+            spans, has_error = self._traces.pop(trace_id, ([], False))
+            if len(spans) < MAX_BUFFERED_SPANS_PER_TRACE:
+                spans.append(span)
+            has_error = has_error or failed
+            if not is_local_root:
+                self._traces[trace_id] = (spans, has_error)
+                while len(self._traces) > MAX_BUFFERED_TRACES:
+                    self._traces.popitem(last=False)
+                return
+
+        if has_error:
+            for buffered in spans:
+                self.delegate.on_end(_as_sampled(buffered))
+
+    def shutdown(self) -> None:
+        self.delegate.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.delegate.force_flush(timeout_millis)
+
+
+class _MeteredSpanExporter(SpanExporter):
+    def __init__(self, exporter: SpanExporter, on_export):
+        self.exporter = exporter
+        self.on_export = on_export
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        self.on_export(len(spans))
+        started = time.perf_counter()
+        result = SpanExportResult.FAILURE
+        try:
+            result = self.exporter.export(spans)
+            return result
+        finally:
+            OTEL_SPAN_EXPORT_DURATION.observe(time.perf_counter() - started)
+            OTEL_SPANS_EXPORTED.labels(result.name.lower()).inc(len(spans))
+
+    def shutdown(self) -> None:
+        self.exporter.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.exporter.force_flush(timeout_millis)
+
+
+class InstrumentedBatchSpanProcessor(BatchSpanProcessor):
+    """
+    BatchSpanProcessor exporting queue size, drops and export latency.
+
+    The queue is tracked from the outside (spans accepted minus spans handed
+    to the exporter), since the SDK only reports drops to its own metrics.
+    """
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        max_queue_size: int,
+        schedule_delay_millis: float,
+        max_export_batch_size: int,
+        export_timeout_millis: float,
+    ):
+        self._max_queue_size = max_queue_size
+        self._queued = 0
+        self._queue_lock = threading.Lock()
+        super().__init__(
+            _MeteredSpanExporter(exporter, self._on_export),
+            max_queue_size=max_queue_size,
+            schedule_delay_millis=schedule_delay_millis,
+            max_export_batch_size=max_export_batch_size,
+            export_timeout_millis=export_timeout_millis,
+        )
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if not span.context.trace_flags.sampled:
+            return
+        with self._queue_lock:
+            if self._queued >= self._max_queue_size:
+                OTEL_SPANS_DROPPED.inc()
+            else:
+                self._queued += 1
+            OTEL_SPAN_QUEUE_SIZE.set(self._queued)
+        super().on_end(span)
+
+    def _on_export(self, count: int) -> None:
+        with self._queue_lock:
+            self._queued = max(0, self._queued - count)
+            OTEL_SPAN_QUEUE_SIZE.set(self._queued)
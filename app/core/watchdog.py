@@ -0,0 +1,154 @@
+"""
+Event-loop stall detection.
+
+A task on the event loop wakes up every `interval` seconds and records how
+late it was (the loop lag). A separate thread watches the task's heartbeat:
+when the loop hasn't come back for `threshold` seconds, something is
+blocking it, so the thread grabs the loop thread's current stack and the
+request being served and reports them to the log and Sentry while the
+stall is still in progress.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from types import FrameType
+from typing import Any
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import EVENT_LOOP_LAG, EVENT_LOOP_STALLS
+
+logger = get_logger(__name__)
+
+
+def find_request(frame: FrameType | None) -> dict[str, str] | None:
+    """
+    Describe the request a stack is serving.
+
+    Walks outwards from `frame` to the innermost ASGI frame that has an
+    HTTP `scope` local (middleware and routing frames do) and reads the
+    method, path and, once routing has matched, the route template.
+
+    Returns:
+        {"method", "path", "route"} or None when no request is on the stack
+    """
+    while frame is not None:
+        scope = frame.f_locals.get("scope")
+        if isinstance(scope, dict) and scope.get("type") in ("http", "websocket"):
+            route = scope.get("route")
+            return {
+                "method": scope.get("method", ""),
+                "path": scope.get("path", ""),
+                "route": getattr(route, "path", None) or "unknown",
+            }
+        frame = frame.f_back
+    return None
+
+
+class LoopWatchdog:
+    """
+    Measures event-loop lag and reports stalls with the blocking stack.
+
+    - Lag of every tick goes to the `event_loop_lag_seconds` histogram
+    - A stall longer than `threshold` is reported once (log + Sentry) with
+      the loop thread's stack, capped at `max_stack_depth` frames
+    """
+
+    def __init__(self, interval: float, threshold: float, max_stack_depth: int):
+        self.interval = interval
+        self.threshold = threshold
+        self.max_stack_depth = max_stack_depth
+        self.last_stall: dict[str, Any] | None = None
+        self._heartbeat = 0.0
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """Start watching the running event loop."""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._tick())
+        self._thread = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    async def stop(self) -> None:
+        """Stop the lag probe and the watchdog thread."""
+        if self._task is None:
+            return
+        self._stop.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._thread.join()
+        self._thread = None
+
+    async def _tick(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            EVENT_LOOP_LAG.observe(max(0.0, now - expected))
+            self._heartbeat = now
+
+    def _watch(self) -> None:
+        reported = None
+        # Check often enough to catch a stall shortly after the threshold
+        while not self._stop.wait(min(self.interval, self.threshold / 2)):
+            heartbeat = self._heartbeat
+            stalled_for = time.monotonic() - heartbeat
+            if stalled_for - self.interval < self.threshold or heartbeat == reported:
+                continue
+            reported = heartbeat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            try:
+                self._report(frame, stalled_for - self.interval)
+            except Exception:
+                # Keep watching: one failed report must not end stall detection
+                logger.exception("Failed to report event loop stall")
+
+    def _report(self, frame: FrameType, stalled_for: float) -> None:
+        stack = traceback.format_list(
+            traceback.extract_stack(frame, limit=self.max_stack_depth)
+        )
+        stall = {
+            "stalled_ms": round(stalled_for * 1000, 1),
+            "request": find_request(frame),
+            # Not "stack": structlog's console renderer expects a string there
+            "stack_frames": [line.rstrip() for line in stack],
+        }
+        self.last_stall = stall
+        EVENT_LOOP_STALLS.inc()
+        logger.warning("Event loop stalled", **stall)
+
+        import sentry_sdk
+
+        if sentry_sdk.get_client().is_active():
+            with sentry_sdk.new_scope() as scope:
+                scope.set_context("event_loop_stall", stall)
+                if stall["request"] is not None:
+                    scope.set_tag("route", stall["request"]["route"])
+                sentry_sdk.capture_message("Event loop stalled", level="warning")
+
+
+loop_watchdog = LoopWatchdog(
+    interval=settings.WATCHDOG_INTERVAL_SECONDS,
+    threshold=settings.WATCHDOG_STALL_THRESHOLD_SECONDS,
+    max_stack_depth=settings.WATCHDOG_MAX_STACK_DEPTH,
+)
@@ -2,6 +2,22 @@
 Database configuration and session management.
 """
 
-from app.db.session import AsyncSession, async_session_maker, engine
+from app.db.session import (
+    AsyncSession,
+    async_session_maker,
+    dispose_engines,
+    get_engine,
+    init_engine,
+    read_session,
+    replica_router,
+)
 
-__all__ = ["engine", "async_session_maker", "AsyncSession"]
+__all__ = [
+    "init_engine",
+    "get_engine",
+    "dispose_engines",
+    "async_session_maker",
+    "AsyncSession",
+    "read_session",
+    "replica_router",
+]
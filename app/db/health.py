@@ -0,0 +1,224 @@
+"""
+Background database health monitoring.
+
+Replaces per-checkout `pool_pre_ping`: a background task periodically pings
+idle pooled connections, evicts the pool when one is dead, and caches the
+result for the /readyz endpoint.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Returned by a ping that timed out waiting for a pooled connection
+_SATURATED = "saturated"
+
+
+class DatabaseHealthMonitor:
+    """
+    Periodically validates an engine's pooled connections.
+
+    Each run checks out up to `max_connections` idle connections (at least
+    one, so an empty pool still proves the database is reachable) and runs
+    `SELECT 1` on each. Any failure marks the database unhealthy and
+    disposes the pool so no request is handed a dead connection. A
+    disconnect seen by regular traffic marks it unhealthy immediately and
+    triggers an early re-check.
+
+    A saturated pool is not a database failure: when every connection is
+    checked out the run is skipped, and a ping that times out while still
+    waiting for a connection only flags `pool_saturated`. Neither changes
+    the health or disposes the pool, which would drop every connection at
+    peak load and take the pod out of rotation.
+
+    The engine is attached with `attach()` once it exists (at app startup).
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        timeout: float,
+        max_connections: int,
+        engine: AsyncEngine | None = None,
+    ):
+        self.engine: AsyncEngine | None = None
+        self.interval = interval
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.healthy: bool | None = None
+        self.last_checked_at: float | None = None
+        self.last_latency: float | None = None
+        self.last_error: str | None = None
+        self.pool_saturated = False
+        self._task: asyncio.Task | None = None
+        self._wakeup: asyncio.Event | None = None
+
+        if engine is not None:
+            self.attach(engine)
+
+    def attach(self, engine: AsyncEngine) -> None:
+        """Monitor `engine` (no-op if it is already the monitored engine)."""
+        if self.engine is engine:
+            return
+        if self.engine is not None:
+            event.remove(self.engine.sync_engine, "handle_error", self._on_error)
+        self.engine = engine
+        self.healthy = None
+        event.listen(engine.sync_engine, "handle_error", self._on_error)
+
+    def _on_error(self, context: ExceptionContext) -> None:
+        if not context.is_disconnect:
+            return
+        if self.healthy:
+            logger.warning(
+                "Database disconnect detected", error=str(context.original_exception)
+            )
+        self.healthy = False
+        if self._wakeup is not None:
+            # Async engines run this hook in a greenlet on the loop thread
+            self._wakeup.set()
+
+    async def check(self) -> bool:
+        """Ping idle connections once and update the cached status."""
+        pool = self.engine.sync_engine.pool
+        idle = pool.checkedin() if isinstance(pool, QueuePool) else 1
+        if idle == 0 and isinstance(pool, QueuePool) and pool.checkedout() > 0:
+            # Every connection is serving requests; waiting for one would
+            # only measure the pool
+            self._mark_saturated()
+            return self.healthy
+        count = max(1, min(idle, self.max_connections))
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(self._ping() for _ in range(count)))
+        errors = [error for error in results if error not in (None, _SATURATED)]
+
+        self.last_checked_at = time.time()
+        self.last_latency = time.perf_counter() - started
+        was_healthy = self.healthy
+
+        if not errors and None not in results:
+            self._mark_saturated()
+            return self.healthy
+        self.pool_saturated = False
+
+        if errors:
+            self.healthy = False
+            self.last_error = errors[0]
+            # Drop every idle connection; checked-out ones are discarded on return
+            await self.engine.dispose()
+            if was_healthy is not False:
+                logger.error("Database unhealthy", error=self.last_error)
+        else:
+            self.healthy = True
+            self.last_error = None
+            if was_healthy is False:
+                logger.info("Database healthy again")
+        return self.healthy
+
+    def _mark_saturated(self) -> None:
+        if not self.pool_saturated:
+            logger.warning("Database pool saturated, skipping health check")
+        self.pool_saturated = True
+        self.last_checked_at = time.time()
+
+    async def _ping(self) -> str | None:
+        """
+        Returns:
+            None if the ping succeeded, `_SATURATED` if no connection could
+            be checked out in time, else the error
+        """
+        connected = False
+        try:
+            async with asyncio.timeout(self.timeout):
+                async with self.engine.connect() as conn:
+                    connected = True
+                    try:
+                        await conn.exec_driver_sql("SELECT 1")
+                    except Exception:
+                        await conn.invalidate()
+                        raise
+        except (TimeoutError, sa_exc.TimeoutError) as exc:
+            pool = self.engine.sync_engine.pool
+            if not connected and (
+                isinstance(exc, sa_exc.TimeoutError)
+                or (isinstance(pool, QueuePool) and pool.checkedin() == 0)
+            ):
+                return _SATURATED
+            return f"{type(exc).__name__}: {exc}"
+        except Exception as exc:
+            return f"{type(exc).__name__}: {exc}"
+        return None
+
+    def start(self) -> None:
+        """Start the background check loop on the running event loop."""
+        if self._task is not None:
+            return
+        if self.engine is None:
+            raise RuntimeError("attach() an engine before starting health checks")
+        self._wakeup = asyncio.Event()
+
+        async def run() -> None:
+            while True:
+                await self.check()
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.interval)
+                except TimeoutError:
+                    pass
+
+        self._task = asyncio.get_running_loop().create_task(run())
+
+    async def stop(self) -> None:
+        """Stop the background check loop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+
+    def status(self) -> dict[str, Any]:
+        """Cached health and current pool usage, for readiness probes."""
+        pool = self.engine.sync_engine.pool if self.engine is not None else None
+        status: dict[str, Any] = {
+            "healthy": self.healthy,
+            "last_checked_at": self.last_checked_at,
+            "last_latency_ms": (
+                round(self.last_latency * 1000, 2)
+                if self.last_latency is not None
+                else None
+            ),
+            "last_error": self.last_error,
+            "pool_saturated": self.pool_saturated,
+        }
+        if isinstance(pool, QueuePool):
+            status["pool"] = {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+            }
+        return status
+
+
+db_health = DatabaseHealthMonitor(
+    interval=settings.DB_HEALTH_CHECK_INTERVAL_SECONDS,
+    timeout=settings.DB_HEALTH_CHECK_TIMEOUT_SECONDS,
+    max_connections=settings.DB_HEALTH_CHECK_MAX_CONNECTIONS,
+)
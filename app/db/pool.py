@@ -0,0 +1,97 @@
+"""
+Connection pool instrumentation.
+
+Pool activity is exported to Prometheus, labelled by pool name:
+checked-out and overflow connections, checkout wait time and timeouts,
+and the age of connections handed out (to tune DB_POOL_RECYCLE).
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import (
+    AsyncAdaptedQueuePool,
+    ConnectionPoolEntry,
+    PoolProxiedConnection,
+)
+
+from app.core.metrics import (
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_CHECKOUT_TIMEOUTS,
+    DB_POOL_CHECKOUT_WAIT,
+    DB_POOL_CONNECTION_AGE,
+    DB_POOL_OVERFLOW,
+)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool that times every checkout.
+
+    Pool events only fire once a connection has been obtained, so the wait
+    (including timeouts) is measured around `connect()`. The pool name is
+    taken from `pool_logging_name`, which survives `engine.dispose()`.
+    """
+
+    @property
+    def metrics_name(self) -> str:
+        return self.logging_name or "primary"
+
+    def connect(self) -> PoolProxiedConnection:
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except sa_exc.TimeoutError:
+            DB_POOL_CHECKOUT_TIMEOUTS.labels(self.metrics_name).inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(self.metrics_name).observe(
+                time.perf_counter() - started
+            )
+
+
+def instrument_pool(engine: AsyncEngine, name: str) -> None:
+    """
+    Export pool usage metrics for an engine built with InstrumentedAsyncQueuePool.
+
+    Args:
+        engine: Engine whose pool to observe
+        name: Value of the `pool` label
+    """
+    checked_out = DB_POOL_CHECKED_OUT.labels(name)
+    overflow = DB_POOL_OVERFLOW.labels(name)
+    connection_age = DB_POOL_CONNECTION_AGE.labels(name)
+    sync_engine = engine.sync_engine
+
+    def update_gauges(returning: int = 0) -> None:
+        # "checkin" fires before the connection is back in the pool, which
+        # closes it (dropping the overflow) when the pool is already full
+        pool = sync_engine.pool
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            closing = returning if pool.checkedin() >= pool.size() else 0
+            checked_out.set(pool.checkedout() - returning)
+            overflow.set(max(pool.overflow() - closing, 0))
+
+    @event.listens_for(sync_engine, "connect")
+    def on_connect(dbapi_connection: Any, record: ConnectionPoolEntry) -> None:
+        record.info["connected_at"] = time.monotonic()
+
+    @event.listens_for(sync_engine, "checkout")
+    def on_checkout(
+        dbapi_connection: Any,
+        record: ConnectionPoolEntry,
+        proxy: PoolProxiedConnection,
+    ) -> None:
+        connected_at = record.info.get("connected_at")
+        if connected_at is not None:
+            connection_age.observe(time.monotonic() - connected_at)
+        update_gauges()
+
+    @event.listens_for(sync_engine, "checkin")
+    def on_checkin(dbapi_connection: Any, record: ConnectionPoolEntry) -> None:
+        update_gauges(returning=1)
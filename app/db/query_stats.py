@@ -0,0 +1,271 @@
+"""
+Per-query-shape statistics and the slow-query log.
+
+Cursor events on each engine normalize every statement into a fingerprint
+(literals, bind parameters and IN/VALUES lists replaced by placeholders)
+and keep running totals per fingerprint: executions, total and max time,
+and rows (as reported by the driver's rowcount). Statements slower than a
+threshold are logged with the shapes (types, never values) of their bind
+parameters. The most expensive fingerprints are served by /debug/queries
+and exported to Prometheus with a bounded number of label values.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Iterator
+
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, ExceptionContext, ExecutionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import register_process_collector
+
+logger = get_logger(__name__)
+
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+# $1 (asyncpg), %(name)s / %s (psycopg), :name, ? (sqlite); not ::casts
+_PARAM_RE = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<![:\w]):\w+|\?")
+_NUMBER_RE = re.compile(r"(?<![\w$.])\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_PLACEHOLDERS = r"\(\s*\?(?:\s*,\s*\?)*\s*\)"
+_LIST_RE = re.compile(rf"\b(IN|VALUES)\s*{_PLACEHOLDERS}", re.IGNORECASE)
+_ROWS_RE = re.compile(rf"(VALUES \(\.\.\.\))(?:\s*,\s*{_PLACEHOLDERS})+", re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Longest `query` label value exported to Prometheus
+_LABEL_MAX_LENGTH = 200
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """
+    Normalize a SQL statement into its shape.
+
+    IN lists and multi-row VALUES of any length share one fingerprint:
+
+        SELECT * FROM users WHERE id IN ($1, $2, $3) LIMIT 10
+        -> SELECT * FROM users WHERE id IN (...) LIMIT ?
+
+    Cached, as an application only issues a bounded set of statements.
+    """
+    statement = _COMMENT_RE.sub(" ", statement)
+    statement = _STRING_RE.sub("?", statement)
+    statement = _PARAM_RE.sub("?", statement)
+    statement = _NUMBER_RE.sub("?", statement)
+    statement = _LIST_RE.sub(r"\1 (...)", statement)
+    statement = _ROWS_RE.sub(r"\1, ...", statement)
+    return _WHITESPACE_RE.sub(" ", statement).strip()
+
+
+def parameter_shapes(parameters: Any, executemany: bool = False) -> Any:
+    """
+    Describe bind parameters by type, so values (PII, secrets) are never logged.
+
+    Returns:
+        {"name": "str", ...} or ["int", ...]; for executemany,
+        {"rows": N, "shape": <shape of the first row>}
+    """
+    if executemany:
+        rows = list(parameters or ())
+        return {"rows": len(rows), "shape": parameter_shapes(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {name: _shape(value) for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_shape(value) for value in parameters]
+    return None
+
+
+def _shape(value: Any) -> str:
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def _rows(cursor: Any) -> int | None:
+    """
+    Rows returned or affected, per the DBAPI `rowcount`.
+
+    asyncpg reports it for SELECTs too; drivers report -1 (None here) when
+    they can't tell, e.g. for server-side cursors or SQLite SELECTs.
+    """
+    rowcount = getattr(cursor, "rowcount", -1)
+    return rowcount if rowcount is not None and rowcount >= 0 else None
+
+
+@dataclass
+class QueryStats:
+    fingerprint: str
+    query_id: str
+    calls: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    rows: int = 0
+    # Executions whose driver didn't report a row count (not in `rows`)
+    rows_unknown: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "query_id": self.query_id,
+            "fingerprint": self.fingerprint,
+            "calls": self.calls,
+            "total_ms": round(self.total_time * 1000, 3),
+            "mean_ms": round(self.total_time * 1000 / self.calls, 3),
+            "max_ms": round(self.max_time * 1000, 3),
+            "rows": self.rows,
+            "rows_unknown": self.rows_unknown,
+        }
+
+
+_SORT_KEYS = {
+    "total": lambda stats: stats.total_time,
+    "mean": lambda stats: stats.total_time / stats.calls,
+    "max": lambda stats: stats.max_time,
+    "calls": lambda stats: stats.calls,
+    "rows": lambda stats: stats.rows,
+}
+
+
+class QueryStatsCollector(Collector):
+    """
+    Running per-fingerprint query statistics of this worker.
+
+    At most `max_fingerprints` are kept: a new fingerprint evicts the one
+    with the least total time. Also a Prometheus collector exporting the
+    `top_n` fingerprints by total time (labels `query_id` and a truncated
+    `query`), so label cardinality stays bounded; evicted series reset.
+    """
+
+    def __init__(self, slow_threshold: float, max_fingerprints: int, top_n: int):
+        self.slow_threshold = slow_threshold
+        self.max_fingerprints = max_fingerprints
+        self.top_n = top_n
+        self._stats: dict[str, QueryStats] = {}
+        self._lock = threading.Lock()
+
+    def instrument(self, engine: AsyncEngine, name: str) -> None:
+        """
+        Record the statements executed by `engine`.
+
+        Args:
+            engine: Engine to listen to
+            name: Engine name included in slow-query log entries
+        """
+        sync_engine = engine.sync_engine
+
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def before_execute(
+            conn: Connection,
+            cursor: Any,
+            statement: str,
+            parameters: Any,
+            context: ExecutionContext,
+            executemany: bool,
+        ) -> None:
+            conn.info["query_started"] = time.perf_counter()
+
+        @event.listens_for(sync_engine, "after_cursor_execute")
+        def after_execute(
+            conn: Connection,
+            cursor: Any,
+            statement: str,
+            parameters: Any,
+            context: ExecutionContext,
+            executemany: bool,
+        ) -> None:
+            elapsed = time.perf_counter() - conn.info.pop("query_started")
+            rows = _rows(cursor)
+            self.record(statement, elapsed, rows)
+            if elapsed >= self.slow_threshold:
+                logger.warning(
+                    "Slow query",
+                    engine=name,
+                    duration_ms=round(elapsed * 1000, 3),
+                    rows=rows,
+                    fingerprint=fingerprint(statement),
+                    params=parameter_shapes(parameters, executemany),
+                )
+
+        @event.listens_for(sync_engine, "handle_error")
+        def on_error(context: ExceptionContext) -> None:
+            # A failed statement never reaches after_cursor_execute
+            if context.connection is not None:
+                context.connection.info.pop("query_started", None)
+
+    def record(self, statement: str, elapsed: float, rows: int | None) -> None:
+        """Add one execution of `statement` to its fingerprint's totals."""
+        key = fingerprint(statement)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= self.max_fingerprints:
+                    evicted = min(self._stats.values(), key=_SORT_KEYS["total"])
+                    del self._stats[evicted.fingerprint]
+                stats = self._stats[key] = QueryStats(
+                    key, hashlib.sha1(key.encode()).hexdigest()[:12]
+                )
+            stats.calls += 1
+            stats.total_time += elapsed
+            if rows is None:
+                stats.rows_unknown += 1
+            else:
+                stats.rows += rows
+            if elapsed > stats.max_time:
+                stats.max_time = elapsed
+
+    def top(self, limit: int | None = None, sort: str = "total") -> list[QueryStats]:
+        """The `limit` (default `top_n`) most expensive fingerprints by `sort`."""
+        with self._lock:
+            stats = list(self._stats.values())
+        stats.sort(key=_SORT_KEYS[sort], reverse=True)
+        return stats[: limit or self.top_n]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def collect(self) -> Iterator[CounterMetricFamily | GaugeMetricFamily]:
+        labels = ["query_id", "query"]
+        calls = CounterMetricFamily(
+            "db_query_calls", "Executions of the top query fingerprints", labels=labels
+        )
+        duration = CounterMetricFamily(
+            "db_query_duration_seconds",
+            "Total execution time of the top query fingerprints",
+            labels=labels,
+        )
+        max_duration = GaugeMetricFamily(
+            "db_query_max_duration_seconds",
+            "Slowest execution of the top query fingerprints",
+            labels=labels,
+        )
+        rows = CounterMetricFamily(
+            "db_query_rows",
+            "Rows returned or affected by the top query fingerprints, where "
+            "the driver reports a row count",
+            labels=labels,
+        )
+        for stats in self.top():
+            values = [stats.query_id, stats.fingerprint[:_LABEL_MAX_LENGTH]]
+            calls.add_metric(values, stats.calls)
+            duration.add_metric(values, stats.total_time)
+            max_duration.add_metric(values, stats.max_time)
+            rows.add_metric(values, stats.rows)
+        yield from (calls, duration, max_duration, rows)
+
+
+query_stats = QueryStatsCollector(
+    slow_threshold=settings.DB_SLOW_QUERY_THRESHOLD_MS / 1000,
+    max_fingerprints=settings.DB_QUERY_STATS_MAX_FINGERPRINTS,
+    top_n=settings.DB_QUERY_STATS_TOP_N,
+)
+register_process_collector(query_stats)
@@ -1,36 +1,311 @@
 from __future__ import annotations
 
-from typing import AsyncGenerator
+import asyncio
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Iterator
 
+from sqlalchemy import event
+from sqlalchemy.engine import ExceptionContext
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.orm import Session
 
-from app.core.config import settings
+from app.core.config import Settings, settings
+from app.core.logging import get_logger
+from app.db.pool import InstrumentedAsyncQueuePool, instrument_pool
+from app.db.query_stats import query_stats
+
+logger = get_logger(__name__)
+
+_SESSION_OPTIONS: dict[str, Any] = {
+    "class_": AsyncSession,
+    "expire_on_commit": False,  # Don't expire objects after commit
+    "autoflush": False,
+    "autocommit": False,
+}
+
+
+class PrimarySession(Session):
+    """Session class behind the primary factory, so its writes can be tracked."""
 
-# Create async engine
-engine: AsyncEngine = create_async_engine(
-    settings.SQLALCHEMY_DATABASE_URI,
-    echo=settings.DEBUG,  # Log SQL queries in development
-    future=True,
-    pool_pre_ping=True,  # Verify connections before using them
-    pool_size=20,  # Number of connections to keep in pool
-    max_overflow=10,  # Additional connections beyond pool_size
-)
 
-# Create async session factory
+def _create_engine(uri: str, name: str, settings: Settings) -> AsyncEngine:
+    """Create an engine with the configured, instrumented pool and query stats."""
+    created = create_async_engine(
+        uri,
+        pool_logging_name=name,
+        echo=settings.DEBUG,  # Log SQL queries in development
+        future=True,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    instrument_pool(created, name)
+    if settings.DB_QUERY_STATS_ENABLED:
+        query_stats.instrument(created, name)
+    return created
+
+
+# Primary engine: created by init_engine() (the app lifespan or a CLI command)
+engine: AsyncEngine | None = None
+
+# Session factory for the primary; bound to the engine by init_engine()
 async_session_maker = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,  # Don't expire objects after commit
-    autoflush=False,
-    autocommit=False,
+    sync_session_class=PrimarySession,
+    **_SESSION_OPTIONS,
+)
+
+
+@dataclass
+class ReadYourWrites:
+    """
+    One client's read-after-write state, for the duration of a request.
+
+    `primary_until` is a wall-clock (epoch) time so it means the same thing
+    in every worker; the client carries it between requests in a cookie.
+    """
+
+    primary_until: float = 0.0
+    wrote: bool = False
+
+
+_read_your_writes: ContextVar[ReadYourWrites | None] = ContextVar(
+    "read_your_writes", default=None
+)
+
+
+class ReplicaRouter:
+    """
+    Routes read-only sessions to a round-robin pool of replica engines.
+
+    Reads fall back to the primary when:
+    - no replicas are configured
+    - every replica is currently marked unhealthy
+    - the current client committed a write within `read_after_write`
+      seconds, so a lagging replica can't hide its own writes from it
+
+    Read-after-write is scoped to a client (see `read_your_writes()`), not
+    to the process: other workers must see the pin too, and one client's
+    writes shouldn't move everyone else's reads to the primary. Outside a
+    scope, writes don't pin anything.
+
+    Replica health is refreshed by a background task (`start_health_checks`)
+    and a replica is also marked down as soon as one of its connections
+    reports a disconnect.
+    """
+
+    def __init__(
+        self,
+        primary_maker: async_sessionmaker[AsyncSession],
+        read_after_write: float,
+        replicas: list[AsyncEngine] | None = None,
+    ):
+        self.primary_maker = primary_maker
+        self.read_after_write = read_after_write
+        self._makers: dict[AsyncEngine, async_sessionmaker[AsyncSession]] = {}
+        self._healthy: dict[AsyncEngine, bool] = {}
+        self._round_robin = itertools.count()
+        self._health_task: asyncio.Task | None = None
+
+        for replica in replicas or []:
+            self.add_replica(replica)
+
+    @property
+    def replicas(self) -> list[AsyncEngine]:
+        return list(self._makers)
+
+    def add_replica(self, replica: AsyncEngine) -> None:
+        """Start routing reads to `replica` (assumed healthy until checked)."""
+        self._makers[replica] = async_sessionmaker(replica, **_SESSION_OPTIONS)
+        self._healthy[replica] = True
+        event.listen(
+            replica.sync_engine, "handle_error", self._make_error_hook(replica)
+        )
+
+    def session_maker(self) -> async_sessionmaker[AsyncSession]:
+        """Pick the session factory for the next read-only unit of work."""
+        if not self._makers:
+            return self.primary_maker
+        scope = _read_your_writes.get()
+        if scope is not None and time.time() < scope.primary_until:
+            return self.primary_maker
+
+        healthy = [replica for replica, ok in self._healthy.items() if ok]
+        if not healthy:
+            return self.primary_maker
+        return self._makers[healthy[next(self._round_robin) % len(healthy)]]
+
+    def note_primary_write(self) -> None:
+        """Pin the current client's reads to the primary for `read_after_write`."""
+        scope = _read_your_writes.get()
+        if scope is not None:
+            scope.primary_until = time.time() + self.read_after_write
+            scope.wrote = True
+
+    @contextmanager
+    def read_your_writes(self, primary_until: float = 0.0) -> Iterator[ReadYourWrites]:
+        """
+        Scope read-after-write pinning to one client (e.g. one HTTP request).
+
+        Args:
+            primary_until: Epoch time until which the client's reads stay on
+                the primary, as carried over from its previous requests
+
+        Yields:
+            The scope; `wrote` is set once a write is committed within it
+        """
+        scope = ReadYourWrites(primary_until)
+        token = _read_your_writes.set(scope)
+        try:
+            yield scope
+        finally:
+            _read_your_writes.reset(token)
+
+    def status(self) -> dict[str, bool]:
+        """Health of each replica, keyed by its URL (password hidden)."""
+        return {
+            replica.url.render_as_string(hide_password=True): ok
+            for replica, ok in self._healthy.items()
+        }
+
+    def _set_health(self, replica: AsyncEngine, healthy: bool) -> None:
+        if self._healthy[replica] != healthy:
+            logger.warning(
+                "Replica health changed",
+                replica=replica.url.render_as_string(hide_password=True),
+                healthy=healthy,
+            )
+        self._healthy[replica] = healthy
+
+    def _make_error_hook(self, replica: AsyncEngine):
+        def on_error(context: ExceptionContext) -> None:
+            if context.is_disconnect:
+                self._set_health(replica, False)
+
+        return on_error
+
+    async def check_replicas(self, timeout: float) -> None:
+        """Ping every replica once and update its health."""
+
+        async def ping(replica: AsyncEngine) -> None:
+            try:
+                async with asyncio.timeout(timeout):
+                    async with replica.connect() as conn:
+                        await conn.exec_driver_sql("SELECT 1")
+            except Exception:
+                self._set_health(replica, False)
+            else:
+                self._set_health(replica, True)
+
+        await asyncio.gather(*(ping(replica) for replica in self._makers))
+
+    def start_health_checks(self, interval: float, timeout: float) -> None:
+        """Start the background replica health check loop (no-op without replicas)."""
+        if not self._makers or self._health_task is not None:
+            return
+
+        async def run() -> None:
+            while True:
+                await self.check_replicas(timeout)
+                await asyncio.sleep(interval)
+
+        self._health_task = asyncio.get_running_loop().create_task(run())
+
+    async def stop_health_checks(self) -> None:
+        """Stop the background health check loop."""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+    async def dispose(self) -> None:
+        """Close all replica connection pools."""
+        await asyncio.gather(*(replica.dispose() for replica in self._makers))
+
+
+replica_router = ReplicaRouter(
+    primary_maker=async_session_maker,
+    read_after_write=settings.REPLICA_READ_AFTER_WRITE_SECONDS,
 )
 
 
+def init_engine(settings: Settings = settings) -> AsyncEngine:
+    """
+    Create the primary and replica engines and bind the session factories.
+
+    Nothing connects yet; pools open connections on first use. Safe to call
+    more than once: later calls return the existing primary engine.
+
+    Args:
+        settings: Settings to read the database URIs and pool options from
+
+    Returns:
+        The primary engine
+    """
+    global engine
+
+    if engine is None:
+        engine = _create_engine(settings.SQLALCHEMY_DATABASE_URI, "primary", settings)
+        async_session_maker.configure(bind=engine)
+        replica_router.read_after_write = settings.REPLICA_READ_AFTER_WRITE_SECONDS
+        for index, uri in enumerate(settings.SQLALCHEMY_REPLICA_URIS):
+            replica_router.add_replica(
+                _create_engine(uri, f"replica-{index}", settings)
+            )
+    return engine
+
+
+def get_engine() -> AsyncEngine:
+    """The primary engine, created with the global settings on first use."""
+    return engine if engine is not None else init_engine()
+
+
+async def dispose_engines() -> None:
+    """Close the replica and primary connection pools."""
+    await replica_router.dispose()
+    if engine is not None:
+        await engine.dispose()
+
+
+@event.listens_for(PrimarySession, "after_flush")
+def _mark_session_wrote(session: Session, flush_context: Any) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def _record_primary_write(session: Session) -> None:
+    if session.info.pop("wrote", False):
+        replica_router.note_primary_write()
+
+
+@event.listens_for(PrimarySession, "after_rollback")
+def _clear_session_wrote(session: Session) -> None:
+    session.info.pop("wrote", None)
+
+
+def read_session() -> AsyncSession:
+    """
+    Create a session for read-only work, on a replica when one is usable.
+
+    Never write through this session: use `async_session_maker` instead.
+    """
+    return replica_router.session_maker()()
+
+
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     """
     Create a new async database session.
@@ -1,81 +1,208 @@
-import time
+from contextlib import asynccontextmanager
 
-import sentry_sdk
 from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
-from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
+from app.api.debug import router as debug_router
+from app.api.health import router as health_router
 from app.api.v1.auth import router as auth_router
 from app.api.v1.users import router as users_router
-from app.core.config import settings
+from app.core.config import Settings, settings
 from app.core.handlers import register_exception_handlers
-from app.core.logging import get_logger
-from app.core.metrics import HTTP_LATENCY, HTTP_REQUESTS
-from app.core.telemetry import setup_telemetry
+from app.core.logging import get_logger, setup_logging
+from app.core.memory import memory_tracker
+from app.core.metrics import (
+    cleanup_dead_workers,
+    exposition_cache,
+    mark_worker_dead,
+)
+from app.core.middleware import MetricsMiddleware, ReadYourWritesMiddleware
+from app.core.profiler import profiler
+from app.core.security import shutdown_password_executor, token_cache
+from app.core.watchdog import loop_watchdog
+from app.db.health import db_health
+from app.db.query_stats import query_stats
+from app.db.session import dispose_engines, init_engine, replica_router
+from app.services.user_cache import user_cache
+from app.services.user_import import shutdown_hash_executor
 
 logger = get_logger(__name__)
 
-sentry_sdk.init(
-    dsn=settings.SENTRY_DSN,
-    send_default_pii=True,
-)
 
-setup_telemetry()
+def _setup_sentry(settings: Settings) -> None:
+    import sentry_sdk
 
-app = FastAPI(
-    title=settings.API_TITLE,
-    version=settings.API_VERSION,
-)
+    sentry_sdk.init(
+        dsn=settings.SENTRY_DSN,
+        send_default_pii=True,
+    )
 
-# Configure CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-FastAPIInstrumentor.instrument_app(app)
+def _configure_services(settings: Settings) -> None:
+    """
+    Apply `settings` to the process-wide services.
+
+    The health monitor, watchdog, caches and trackers are module-level
+    singletons (the routers use them directly) built from the global
+    settings at import time; this re-tunes them for the app being started.
+    """
+    db_health.interval = settings.DB_HEALTH_CHECK_INTERVAL_SECONDS
+    db_health.timeout = settings.DB_HEALTH_CHECK_TIMEOUT_SECONDS
+    db_health.max_connections = settings.DB_HEALTH_CHECK_MAX_CONNECTIONS
+
+    loop_watchdog.interval = settings.WATCHDOG_INTERVAL_SECONDS
+    loop_watchdog.threshold = settings.WATCHDOG_STALL_THRESHOLD_SECONDS
+    loop_watchdog.max_stack_depth = settings.WATCHDOG_MAX_STACK_DEPTH
+
+    memory_tracker.frames = settings.MEMORY_TRACE_FRAMES
+    memory_tracker.top_n = settings.MEMORY_TRACE_TOP_N
+    memory_tracker.max_snapshots = settings.MEMORY_TRACE_MAX_SNAPSHOTS
+
+    query_stats.slow_threshold = settings.DB_SLOW_QUERY_THRESHOLD_MS / 1000
+    query_stats.max_fingerprints = settings.DB_QUERY_STATS_MAX_FINGERPRINTS
+    query_stats.top_n = settings.DB_QUERY_STATS_TOP_N
+
+    user_cache.ttl = settings.USER_CACHE_TTL_SECONDS
+    user_cache.negative_ttl = settings.USER_CACHE_NEGATIVE_TTL_SECONDS
+    user_cache.max_size = settings.USER_CACHE_MAX_SIZE
+
+    token_cache.max_size = settings.JWT_CACHE_MAX_SIZE
+    token_cache.max_ttl = settings.JWT_CACHE_MAX_TTL_SECONDS
+
+    exposition_cache.ttl = settings.METRICS_CACHE_SECONDS
+
+    profiler.interval = settings.DEBUG_PROFILE_INTERVAL_MS / 1000
+    profiler.max_overhead = settings.DEBUG_PROFILE_MAX_OVERHEAD
+
+
+def create_app(settings: Settings = settings) -> FastAPI:
+    """
+    Build the FastAPI application.
+
+    Creating the app is cheap: logging, OpenTelemetry and the database
+    engines are only set up by the lifespan when the server starts, each
+    behind its `*_ENABLED` toggle, and the engines are disposed on shutdown.
+    Sentry is the exception: it is initialized here, before the routes and
+    middleware it instruments are built.
+
+    The lifespan also applies `settings` to the process-wide services
+    (health monitor, watchdog, profiler, caches, query stats). There is one
+    of each per process, so with several apps in one process the last one
+    started wins. Request limits and defaults are read from
+    `app.state.settings` (see `get_settings`).
+
+    Args:
+        settings: Application settings
+
+    Returns:
+        The configured application
+    """
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        """Start subsystems and background services, release them on shutdown."""
+        _configure_services(settings)
+        if settings.LOGGING_ENABLED:
+            setup_logging(settings)
+
+        engine = init_engine(settings)
+        if settings.OTEL_ENABLED:
+            from app.core.telemetry import setup_telemetry
+
+            setup_telemetry(settings, engines=[engine, *replica_router.replicas])
+
+        if settings.METRICS_ENABLED:
+            dead_workers = cleanup_dead_workers()
+            if dead_workers:
+                logger.info("Cleaned up metrics of dead workers", pids=dead_workers)
+
+        if settings.WATCHDOG_ENABLED:
+            loop_watchdog.start()
+        if settings.MEMORY_MONITOR_ENABLED:
+            memory_tracker.start_monitor(settings.MEMORY_MONITOR_INTERVAL_SECONDS)
+        db_health.attach(engine)
+        db_health.start()
+        replica_router.start_health_checks(
+            interval=settings.REPLICA_HEALTH_CHECK_INTERVAL_SECONDS,
+            timeout=settings.REPLICA_HEALTH_CHECK_TIMEOUT_SECONDS,
+        )
+        yield
+        await loop_watchdog.stop()
+        await memory_tracker.stop_monitor()
+        await db_health.stop()
+        await replica_router.stop_health_checks()
+        shutdown_password_executor()
+        shutdown_hash_executor()
+        await dispose_engines()
+        if settings.METRICS_ENABLED:
+            mark_worker_dead()
+
+    # Before any route or middleware is built: the Starlette/FastAPI
+    # integrations wrap them as they are constructed
+    if settings.SENTRY_ENABLED and settings.SENTRY_DSN:
+        _setup_sentry(settings)
+
+    app = FastAPI(
+        title=settings.API_TITLE,
+        version=settings.API_VERSION,
+        lifespan=lifespan,
+    )
+    app.state.settings = settings
 
-# Register exception handlers
-register_exception_handlers(app)
+    app.add_middleware(ReadYourWritesMiddleware, router=replica_router)
 
-# Include API routers
-app.include_router(auth_router, prefix=settings.API_V1_PREFIX)
-app.include_router(users_router, prefix=settings.API_V1_PREFIX)
+    # Configure CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.CORS_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
 
+    if settings.OTEL_ENABLED:
+        from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
 
-@app.middleware("http")
-async def metrics_middleware(request: Request, call_next):
-    start = time.perf_counter()
-    response = await call_next(request)
-    duration = time.perf_counter() - start
+        FastAPIInstrumentor.instrument_app(app)
 
-    route = request.scope.get("route")
-    path = route.path if route else "unknown"
+    # Register exception handlers
+    register_exception_handlers(app)
 
-    HTTP_REQUESTS.labels(
-        request.method,
-        path,
-        response.status_code,
-    ).inc()
+    # Include API routers
+    app.include_router(health_router)
+    app.include_router(debug_router)
+    app.include_router(auth_router, prefix=settings.API_V1_PREFIX)
+    app.include_router(users_router, prefix=settings.API_V1_PREFIX)
 
-    HTTP_LATENCY.labels(path).observe(duration)
+    if settings.METRICS_ENABLED:
+        app.add_api_route("/metrics", metrics, methods=["GET"])
+    app.add_api_route("/", root, methods=["GET"])
 
-    return response
+    return app
 
 
-@app.get("/metrics")
-def metrics():
+async def metrics(request: Request):
+    # Exemplars are only exposed in the OpenMetrics format
+    openmetrics = "application/openmetrics-text" in request.headers.get("accept", "")
+    exposition = await exposition_cache.get(openmetrics)
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        return Response(
+            exposition.gzipped,
+            media_type=exposition.content_type,
+            headers={"Content-Encoding": "gzip", "Vary": "Accept, Accept-Encoding"},
+        )
     return Response(
-        generate_latest(),
-        media_type=CONTENT_TYPE_LATEST,
+        exposition.content,
+        media_type=exposition.content_type,
+        headers={"Vary": "Accept, Accept-Encoding"},
     )
 
 
-@app.get("/")
 async def root():
     logger.info("Application is running", __path__="/", status="200", method="GET")
     return {"message": "Hello World"}
+
+
+app = create_app()
@@ -0,0 +1,21 @@
+"""
+Pydantic request and response schemas.
+"""
+
+from app.schemas.user import (
+    UserCreate,
+    UserImportIssue,
+    UserImportReport,
+    UserPage,
+    UserRead,
+    UserUpdate,
+)
+
+__all__ = [
+    "UserCreate",
+    "UserImportIssue",
+    "UserImportReport",
+    "UserPage",
+    "UserRead",
+    "UserUpdate",
+]
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict, EmailStr
+
+
+class UserRead(BaseModel):
+    """Public representation of a user (never includes the password hash)."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    email: str
+    username: str
+    is_active: bool
+    is_superuser: bool
+    created_at: datetime
+    updated_at: datetime
+
+
+class UserCreate(BaseModel):
+    """Payload for creating a user."""
+
+    email: EmailStr
+    username: str
+    password: str
+
+
+class UserUpdate(BaseModel):
+    """Payload for updating a user. Omitted fields are left unchanged."""
+
+    email: EmailStr | None = None
+    username: str | None = None
+    password: str | None = None
+    is_active: bool | None = None
+
+
+class UserPage(BaseModel):
+    """A page of users plus the opaque cursor for the next page."""
+
+    users: list[UserRead]
+    next_cursor: str | None = None
+
+
+class UserImportIssue(BaseModel):
+    """A row of a bulk import that was not inserted."""
+
+    line: int
+    email: str | None = None
+    username: str | None = None
+    reason: str
+
+
+class UserImportReport(BaseModel):
+    """Outcome and throughput of a bulk user import."""
+
+    total_rows: int = 0
+    inserted: int = 0
+    conflicts: int = 0
+    invalid: int = 0
+    issues: list[UserImportIssue] = []
+    hash_seconds: float = 0.0
+    load_seconds: float = 0.0
+    elapsed_seconds: float = 0.0
+    rows_per_second: float = 0.0
@@ -0,0 +1,3 @@
+"""
+Service layer: data access and business logic shared by API routes.
+"""
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from app.core.config import settings
+from app.core.metrics import USER_CACHE_LOOKUPS
+from app.models.user import User
+from app.services.user_loader import load_user
+
+
+class UserCache:
+    """
+    Read-through cache of User rows keyed by id.
+
+    - Found rows live for `ttl` seconds, missing ids for `negative_ttl`
+    - At most `max_size` entries are kept (least recently used go first)
+    - Concurrent misses for the same id share a single load (no stampede)
+    - Callers can demand fresher rows with `get(..., max_age=...)`
+
+    The cache is per worker process: writes must go through the user
+    service, which calls `invalidate()`, and other workers only converge
+    within `ttl`. Authentication therefore reads with a much shorter
+    `max_age` (USER_CACHE_AUTH_MAX_AGE_SECONDS), so a deactivated or demoted
+    user loses access on every worker within that bound.
+    The loader must read from the primary, never a replica: a row that
+    hasn't replicated yet would be cached as missing.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[int], Awaitable[User | None]],
+        ttl: float,
+        negative_ttl: float,
+        max_size: int,
+    ):
+        self.loader = loader
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_size = max_size
+        # user id -> (monotonic time loaded, row or None)
+        self._entries: OrderedDict[int, tuple[float, User | None]] = OrderedDict()
+        self._inflight: dict[int, asyncio.Task[User | None]] = {}
+        self._stale: set[int] = set()
+
+    async def get(self, user_id: int, max_age: float | None = None) -> User | None:
+        """
+        Get a user, loading it on a miss.
+
+        Args:
+            user_id: Primary key of the user
+            max_age: Reload entries loaded longer than this many seconds ago,
+                even if they haven't expired
+
+        Returns:
+            The User, or None if no row exists
+        """
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            loaded_at, user = entry
+            age = time.monotonic() - loaded_at
+            ttl = self.ttl if user is not None else self.negative_ttl
+            if age < ttl and (max_age is None or age < max_age):
+                self._entries.move_to_end(user_id)
+                USER_CACHE_LOOKUPS.labels("hit").inc()
+                return user
+            if age >= ttl:
+                del self._entries[user_id]
+
+        USER_CACHE_LOOKUPS.labels("miss").inc()
+        task = self._inflight.get(user_id)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._load(user_id))
+            self._inflight[user_id] = task
+        return await asyncio.shield(task)
+
+    async def _load(self, user_id: int) -> User | None:
+        try:
+            user = await self.loader(user_id)
+        finally:
+            self._inflight.pop(user_id, None)
+            # Also on failure, or the id would never be cached again
+            stale = user_id in self._stale
+            self._stale.discard(user_id)
+
+        # A write landed while we were loading: serve the result, don't keep it
+        if stale:
+            return user
+
+        ttl = self.ttl if user is not None else self.negative_ttl
+        if ttl > 0:
+            self._entries[user_id] = (time.monotonic(), user)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return user
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop a cached user, including any load currently in flight."""
+        self._entries.pop(user_id, None)
+        if user_id in self._inflight:
+            self._stale.add(user_id)
+
+    def clear(self) -> None:
+        """Drop all cached users."""
+        self._entries.clear()
+        self._stale.update(self._inflight)
+
+
+user_cache = UserCache(
+    loader=load_user,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+    negative_ttl=settings.USER_CACHE_NEGATIVE_TTL_SECONDS,
+    max_size=settings.USER_CACHE_MAX_SIZE,
+)
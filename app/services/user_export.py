@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from typing import AsyncIterator, Literal, Sequence
+
+from sqlalchemy import Row, select
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.session import read_session
+from app.models.user import User
+
+logger = get_logger(__name__)
+
+ExportFormat = Literal["ndjson", "csv"]
+
+EXPORT_COLUMNS = (
+    User.id,
+    User.email,
+    User.username,
+    User.is_active,
+    User.is_superuser,
+    User.created_at,
+    User.updated_at,
+)
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+MEDIA_TYPES: dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+async def export_users(
+    export_format: ExportFormat = "ndjson",
+    batch_size: int | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Stream every user as NDJSON or CSV.
+
+    Rows come from a server-side cursor (`AsyncSession.stream` with
+    `yield_per`), so at most one batch is held in memory. Each batch is
+    yielded as one encoded chunk; the consumer drives the pace, so a slow
+    client simply leaves the cursor idle. The password hash is never
+    exported.
+
+    The generator owns its (read-only, possibly replica) session, so it
+    stays valid for the whole response regardless of when request
+    dependencies are torn down.
+
+    Args:
+        export_format: "ndjson" or "csv"
+        batch_size: Rows per cursor fetch (default: USERS_EXPORT_BATCH_SIZE)
+
+    Yields:
+        Encoded chunks of the export
+    """
+    batch_size = batch_size or settings.USERS_EXPORT_BATCH_SIZE
+    query = (
+        select(*EXPORT_COLUMNS)
+        .order_by(User.id)
+        .execution_options(yield_per=batch_size)
+    )
+
+    if export_format == "csv":
+        yield _encode_csv([EXPORT_FIELDS])
+
+    exported = 0
+    async with read_session() as session:
+        result = await session.stream(query)
+        async for rows in result.partitions():
+            exported += len(rows)
+            if export_format == "csv":
+                yield _encode_csv(rows)
+            else:
+                yield _encode_ndjson(rows)
+
+    logger.info("Users exported", rows=exported, format=export_format)
+
+
+def _encode_ndjson(rows: Sequence[Row]) -> bytes:
+    return "".join(
+        json.dumps(row._asdict(), default=_json_default) + "\n" for row in rows
+    ).encode()
+
+
+def _encode_csv(rows: Sequence[Sequence]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def _json_default(value: object) -> str:
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
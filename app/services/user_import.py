@@ -0,0 +1,423 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import json
+import math
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterator, Literal
+
+from pydantic import ValidationError as SchemaValidationError
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.exceptions import DatabaseError
+from app.core.logging import get_logger
+from app.core.security import hash_password
+from app.db.session import get_engine, replica_router
+from app.models.user import User
+from app.schemas.user import UserCreate, UserImportIssue, UserImportReport
+from app.services.user_cache import user_cache
+
+logger = get_logger(__name__)
+
+ImportFormat = Literal["csv", "ndjson"]
+
+# Only the first issues are listed in the report; the counters stay exact
+MAX_REPORTED_ISSUES = 1000
+
+STAGING_TABLE = "users_import_staging"
+
+# Password hashing pool, created on the first import
+_hash_executor: ProcessPoolExecutor | None = None
+
+# Longest value each imported string column holds (varchar length)
+MAX_LENGTHS = {
+    column: User.__table__.c[column].type.length for column in ("email", "username")
+}
+
+
+async def import_users(
+    chunks: AsyncIterator[bytes],
+    import_format: ImportFormat = "csv",
+) -> UserImportReport:
+    """
+    Bulk-create users from a CSV or NDJSON byte stream.
+
+    Each row needs `email` and `password`; `username` defaults to the email.
+    Rows are processed in batches of USERS_IMPORT_BATCH_SIZE:
+
+    1. Validate rows (including column lengths) and drop rows that repeat
+       an email/username seen earlier
+    2. Hash passwords in parallel on the shared process pool (all cores by
+       default)
+    3. COPY the batch into a temporary staging table
+    4. Merge into `users` with ON CONFLICT DO NOTHING and report which rows
+       collided with the unique email/username indexes
+
+    Args:
+        chunks: Raw input, e.g. a request body stream or file reader
+        import_format: "csv" (with a header row) or "ndjson"
+
+    Returns:
+        Counts, per-row issues and throughput of the import
+
+    Raises:
+        DatabaseError: If the database is not PostgreSQL
+    """
+    if get_engine().dialect.name != "postgresql":
+        raise DatabaseError("Bulk user import requires PostgreSQL (COPY)")
+
+    started = time.perf_counter()
+    report = UserImportReport()
+    seen_emails: set[str] = set()
+    seen_usernames: set[str] = set()
+
+    pool = get_hash_executor()
+    async for batch in _iter_batches(
+        _iter_rows(chunks, import_format), settings.USERS_IMPORT_BATCH_SIZE
+    ):
+        users = _validate_batch(batch, report, seen_emails, seen_usernames)
+        if not users:
+            continue
+
+        hash_started = time.perf_counter()
+        hashed = await _hash_passwords(pool, [user.password for _, user in users])
+        report.hash_seconds += time.perf_counter() - hash_started
+
+        load_started = time.perf_counter()
+        await _load_batch(users, hashed, report)
+        report.load_seconds += time.perf_counter() - load_started
+
+    report.elapsed_seconds = time.perf_counter() - started
+    if report.elapsed_seconds > 0:
+        report.rows_per_second = report.total_rows / report.elapsed_seconds
+
+    logger.info(
+        "Bulk user import finished",
+        total_rows=report.total_rows,
+        inserted=report.inserted,
+        conflicts=report.conflicts,
+        invalid=report.invalid,
+        elapsed_seconds=round(report.elapsed_seconds, 3),
+        rows_per_second=round(report.rows_per_second, 1),
+    )
+    return report
+
+
+async def _iter_lines(
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[tuple[int, str | None]]:
+    """Split a byte stream into numbered, decoded lines (None if not UTF-8)."""
+    buffer = b""
+    line_number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            yield line_number, _decode(line)
+    if buffer:
+        yield line_number + 1, _decode(buffer)
+
+
+def _decode(line: bytes) -> str | None:
+    try:
+        return line.decode(errors="strict").rstrip("\r")
+    except UnicodeDecodeError:
+        return None
+
+
+class _PendingLines:
+    """Lines buffered for csv.reader; exhausted whenever the buffer is empty."""
+
+    def __init__(self) -> None:
+        self.lines: deque[str] = deque()
+
+    def __iter__(self) -> _PendingLines:
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+
+async def _iter_csv_records(
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[tuple[int, list[str] | None]]:
+    """
+    Parse a CSV byte stream into (first line number, values) records.
+
+    One csv.reader reads the whole stream, so quoted fields may span lines.
+    As the input arrives asynchronously, the reader is only advanced once
+    every line of a record is buffered (its quote characters are balanced).
+    """
+    pending = _PendingLines()
+    reader = csv.reader(pending)
+    record: list[str] = []
+    quotes = 0
+    first_line = 0
+
+    async for line_number, line in _iter_lines(chunks):
+        if line is None:
+            # Undecodable: the record it is part of is invalid
+            yield first_line if record else line_number, None
+            record, quotes = [], 0
+            continue
+        if not record:
+            if not line.strip():
+                continue
+            first_line = line_number
+        record.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            # A quoted field continues on the next line
+            continue
+        pending.lines.extend(f"{line}\n" for line in record)
+        record, quotes = [], 0
+        yield first_line, _next_record(reader)
+
+    if record:
+        # Unterminated quoted field: the reader takes it up to the end
+        pending.lines.extend(f"{line}\n" for line in record)
+        yield first_line, _next_record(reader)
+
+
+def _next_record(reader: Any) -> list[str] | None:
+    try:
+        return next(reader)
+    except csv.Error:
+        return None
+
+
+async def _iter_rows(
+    chunks: AsyncIterator[bytes], import_format: ImportFormat
+) -> AsyncIterator[tuple[int, dict[str, Any] | None]]:
+    """Parse the input into (line number, row) pairs; unparsable rows are None."""
+    if import_format == "ndjson":
+        async for line_number, line in _iter_lines(chunks):
+            if line is None:
+                yield line_number, None
+                continue
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_number, row if isinstance(row, dict) else None
+        return
+
+    header: list[str] | None = None
+    async for line_number, values in _iter_csv_records(chunks):
+        if header is None:
+            if values is not None:
+                header = [value.strip() for value in values]
+            continue
+        yield line_number, dict(zip(header, values)) if values is not None else None
+
+
+async def _iter_batches(
+    rows: AsyncIterator[tuple[int, dict[str, Any] | None]], size: int
+) -> AsyncIterator[list[tuple[int, dict[str, Any] | None]]]:
+    batch = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _validate_batch(
+    batch: list[tuple[int, dict[str, Any] | None]],
+    report: UserImportReport,
+    seen_emails: set[str],
+    seen_usernames: set[str],
+) -> list[tuple[int, UserCreate]]:
+    """Validate rows and drop in-file duplicates, recording issues."""
+    users = []
+    for line, row in batch:
+        report.total_rows += 1
+        if row is None:
+            report.invalid += 1
+            _add_issue(report, line, reason="invalid_row")
+            continue
+
+        try:
+            user = UserCreate.model_validate(
+                {
+                    "email": row.get("email"),
+                    "username": row.get("username") or row.get("email"),
+                    "password": row.get("password"),
+                }
+            )
+        except SchemaValidationError:
+            report.invalid += 1
+            _add_issue(
+                report,
+                line,
+                email=row.get("email"),
+                username=row.get("username"),
+                reason="invalid_row",
+            )
+            continue
+
+        if any(
+            len(getattr(user, column)) > limit for column, limit in MAX_LENGTHS.items()
+        ):
+            report.invalid += 1
+            _add_issue(
+                report,
+                line,
+                email=user.email,
+                username=user.username,
+                reason="too_long",
+            )
+            continue
+
+        if user.email in seen_emails or user.username in seen_usernames:
+            report.conflicts += 1
+            _add_issue(
+                report,
+                line,
+                email=user.email,
+                username=user.username,
+                reason="duplicate_in_file",
+            )
+            continue
+
+        seen_emails.add(user.email)
+        seen_usernames.add(user.username)
+        users.append((line, user))
+    return users
+
+
+def _hash_many(passwords: list[str]) -> list[str]:
+    """Hash a slice of passwords inside a pool worker process."""
+    return [hash_password(password) for password in passwords]
+
+
+def get_hash_executor() -> ProcessPoolExecutor:
+    """
+    Get the process pool that hashes imported passwords.
+
+    One pool per worker, shared by concurrent imports and kept until
+    shutdown, so its size (USERS_IMPORT_HASH_WORKERS, or all cores) caps the
+    hashing processes whatever the number of imports. Creating it doesn't
+    start any process; `_hash_passwords` submits from the threadpool so
+    spawning them never blocks the event loop.
+
+    Returns:
+        The shared executor instance
+    """
+    global _hash_executor
+
+    if _hash_executor is None:
+        # spawn: forking a process that runs an event loop and exporter
+        # threads is not safe
+        _hash_executor = ProcessPoolExecutor(
+            max_workers=_hash_workers(),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _hash_executor
+
+
+def _hash_workers() -> int:
+    return settings.USERS_IMPORT_HASH_WORKERS or os.cpu_count() or 1
+
+
+def shutdown_hash_executor() -> None:
+    """Shut down the import hashing pool, cancelling queued jobs."""
+    global _hash_executor
+
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=True, cancel_futures=True)
+        _hash_executor = None
+
+
+async def _hash_passwords(pool: ProcessPoolExecutor, passwords: list[str]) -> list[str]:
+    """Hash passwords across all pool workers, preserving order."""
+    size = math.ceil(len(passwords) / _hash_workers())
+    # submit() may spawn a worker process, which blocks: keep it off the loop
+    futures = [
+        await run_in_threadpool(pool.submit, _hash_many, passwords[i : i + size])
+        for i in range(0, len(passwords), size)
+    ]
+    parts = await asyncio.gather(*(asyncio.wrap_future(future) for future in futures))
+    return [hashed for part in parts for hashed in part]
+
+
+async def _load_batch(
+    users: list[tuple[int, UserCreate]],
+    hashed: list[str],
+    report: UserImportReport,
+) -> None:
+    """COPY one batch into a staging table and merge it into users."""
+    table = User.__table__.name
+
+    async with get_engine().connect() as conn:
+        raw = await conn.get_raw_connection()
+        driver = raw.driver_connection
+
+        async with driver.transaction():
+            # Kept per connection (emptied on commit) rather than dropped, so
+            # asyncpg's cached statements keep pointing at the same table
+            await driver.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} ("
+                "line integer, email text, username text, hashed_password text"
+                ") ON COMMIT DELETE ROWS"
+            )
+            await driver.copy_records_to_table(
+                STAGING_TABLE,
+                records=[
+                    (line, user.email, user.username, password_hash)
+                    for (line, user), password_hash in zip(users, hashed)
+                ],
+                columns=["line", "email", "username", "hashed_password"],
+            )
+            inserted = await driver.fetch(
+                f"INSERT INTO {table} "
+                "(email, username, hashed_password, is_active, is_superuser) "
+                "SELECT email, username, hashed_password, true, false "
+                f"FROM {STAGING_TABLE} ORDER BY line "
+                "ON CONFLICT DO NOTHING RETURNING id, email"
+            )
+            inserted_emails = [row["email"] for row in inserted]
+            conflicts = await driver.fetch(
+                "SELECT s.line, s.email, s.username, "
+                f"EXISTS (SELECT 1 FROM {table} u WHERE u.email = s.email) "
+                "AS email_taken "
+                f"FROM {STAGING_TABLE} s "
+                "WHERE s.email <> ALL($1::text[]) ORDER BY s.line",
+                inserted_emails,
+            )
+
+    # Raw COPY bypasses the session write tracking
+    replica_router.note_primary_write()
+
+    report.inserted += len(inserted)
+    report.conflicts += len(conflicts)
+    for row in conflicts:
+        _add_issue(
+            report,
+            row["line"],
+            email=row["email"],
+            username=row["username"],
+            reason="email_exists" if row["email_taken"] else "username_exists",
+        )
+
+    # New ids may be negatively cached from earlier lookups
+    for row in inserted:
+        user_cache.invalidate(row["id"])
+
+
+def _add_issue(report: UserImportReport, line: int, **fields: Any) -> None:
+    if len(report.issues) < MAX_REPORTED_ISSUES:
+        report.issues.append(UserImportIssue(line=line, **fields))
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+import weakref
+from typing import Callable
+
+from sqlalchemy import Integer, any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import USER_LOADER_BATCH_SIZE
+from app.db.session import async_session_maker
+from app.models.user import User
+
+logger = get_logger(__name__)
+
+
+class UserLoader:
+    """
+    DataLoader-style batcher for User lookups by id.
+
+    Lookups that arrive within `batch_window` seconds of each other are
+    collapsed into a single `WHERE id = ANY(...)` query, and concurrent
+    lookups for the same id share one result. A loader is bound to the
+    event loop that created it; use `get_user_loader()` to get the one for
+    the running loop.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        batch_window: float,
+        max_batch_size: int,
+    ):
+        self.session_factory = session_factory
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self._pending: dict[int, asyncio.Future[User | None]] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def load(self, user_id: int) -> User | None:
+        """
+        Load a single user, batched with other concurrent lookups.
+
+        Args:
+            user_id: Primary key of the user
+
+        Returns:
+            The (detached) User, or None if no row exists
+        """
+        future = self._pending.get(user_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending[user_id] = future
+
+            if len(self._pending) >= self.max_batch_size:
+                self._dispatch()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.batch_window, self._dispatch)
+
+        # Shield so one cancelled request doesn't fail everyone sharing the id
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+
+        task = asyncio.get_running_loop().create_task(self._fetch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, batch: dict[int, asyncio.Future[User | None]]) -> None:
+        user_ids = list(batch)
+        USER_LOADER_BATCH_SIZE.observe(len(user_ids))
+
+        try:
+            async with self.session_factory() as session:
+                result = await session.execute(
+                    select(User).where(_user_id_in(session, user_ids))
+                )
+                users = {user.id: user for user in result.scalars()}
+        except Exception as exc:
+            logger.warning("Batched user lookup failed", error=str(exc))
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for user_id, future in batch.items():
+            if not future.done():
+                future.set_result(users.get(user_id))
+
+
+def _user_id_in(session: AsyncSession, user_ids: list[int]):
+    """
+    Build the id filter for a batch.
+
+    On PostgreSQL a single array parameter keeps the statement text
+    identical for every batch size; other dialects fall back to IN.
+    """
+    if session.bind is not None and session.bind.dialect.name == "postgresql":
+        return User.id == any_(
+            bindparam("user_ids", value=user_ids, type_=ARRAY(Integer))
+        )
+    return User.id.in_(user_ids)
+
+
+_loaders: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, UserLoader] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_user_loader() -> UserLoader:
+    """
+    Get the UserLoader for the running event loop, creating it on first use.
+
+    It reads from the primary: it backs authentication and the user cache,
+    where a row missing from a lagging replica would turn into a 401 for a
+    user that was just created, and then be negatively cached.
+
+    Returns:
+        The loader shared by all requests on this loop
+    """
+    loop = asyncio.get_running_loop()
+    loader = _loaders.get(loop)
+    if loader is None:
+        loader = UserLoader(
+            session_factory=async_session_maker,
+            batch_window=settings.USER_LOADER_BATCH_WINDOW_MS / 1000,
+            max_batch_size=settings.USER_LOADER_MAX_BATCH_SIZE,
+        )
+        _loaders[loop] = loader
+    return loader
+
+
+async def load_user(user_id: int) -> User | None:
+    """
+    Load a user by id through the per-loop batching loader.
+
+    Args:
+        user_id: Primary key of the user
+
+    Returns:
+        The User, or None if no row exists
+    """
+    return await get_user_loader().load(user_id)
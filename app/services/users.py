@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.exceptions import ConflictError, ResourceNotFoundError, ValidationError
+from app.core.logging import get_logger
+from app.core.security import hash_password_async, verify_password_async
+from app.models.user import User
+from app.services.user_cache import user_cache
+
+logger = get_logger(__name__)
+
+
+async def get_user(user_id: int, max_age: float | None = None) -> User | None:
+    """
+    Get a user by id through the read-through cache.
+
+    Args:
+        user_id: Primary key of the user
+        max_age: Reload the user if the cached row is older than this
+
+    Returns:
+        The User, or None if no row exists
+    """
+    return await user_cache.get(user_id, max_age)
+
+
+async def get_user_by_email(db: AsyncSession, email: str) -> User | None:
+    """
+    Get a user by email address (uncached).
+
+    Args:
+        db: Database session
+        email: Email address to look up
+
+    Returns:
+        The User, or None if no row exists
+    """
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
+
+
+async def list_users_page(
+    db: AsyncSession,
+    limit: int,
+    cursor: str | None = None,
+    is_active: bool | None = None,
+    max_limit: int | None = None,
+) -> tuple[list[User], str | None]:
+    """
+    Get one page of users in (created_at, id) order.
+
+    Uses keyset pagination: the cursor carries the last row's sort key and
+    the next page starts strictly after it, so every page is an index range
+    scan on ix_users_created_at_id regardless of depth.
+
+    Args:
+        db: Database session
+        limit: Page size, capped at `max_limit`
+        cursor: Opaque cursor returned with the previous page
+        is_active: Only return active (or inactive) users
+        max_limit: Largest page size (default: USERS_PAGE_SIZE_MAX)
+
+    Returns:
+        The page of users and the cursor for the next page (None at the end)
+
+    Raises:
+        ValidationError: If the cursor is malformed
+    """
+    limit = max(1, min(limit, max_limit or settings.USERS_PAGE_SIZE_MAX))
+
+    query = select(User).order_by(User.created_at, User.id).limit(limit + 1)
+    if cursor is not None:
+        created_at, user_id = _decode_cursor(cursor)
+        query = query.where(tuple_(User.created_at, User.id) > (created_at, user_id))
+    if is_active is not None:
+        query = query.where(User.is_active == is_active)
+
+    result = await db.execute(query)
+    users = list(result.scalars())
+
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = _encode_cursor(users[-1])
+    return users, next_cursor
+
+
+def _encode_cursor(user: User) -> str:
+    raw = json.dumps([user.created_at.isoformat(), user.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, user_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(user_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise ValidationError(message="Invalid cursor", details={"cursor": cursor})
+
+
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> User | None:
+    """
+    Check a user's credentials.
+
+    Args:
+        db: Database session
+        email: Email address of the user
+        password: Plain text password
+
+    Returns:
+        The User if the credentials are valid and the account is active,
+        None otherwise
+    """
+    user = await get_user_by_email(db, email)
+    if user is None or not user.is_active:
+        return None
+    if not await verify_password_async(password, user.hashed_password):
+        return None
+    return user
+
+
+async def create_user(
+    db: AsyncSession,
+    email: str,
+    username: str,
+    password: str,
+    is_superuser: bool = False,
+) -> User:
+    """
+    Create a new user.
+
+    Args:
+        db: Database session
+        email: Unique email address
+        username: Unique username
+        password: Plain text password (hashed off the event loop)
+        is_superuser: Grant admin rights
+
+    Returns:
+        The created User
+
+    Raises:
+        ConflictError: If the email or username is already taken
+    """
+    user = User(
+        email=email,
+        username=username,
+        hashed_password=await hash_password_async(password),
+        is_superuser=is_superuser,
+    )
+    db.add(user)
+    await _commit(db, email=email, username=username)
+    await db.refresh(user)
+
+    # The new id may be negatively cached from an earlier lookup
+    user_cache.invalidate(user.id)
+    logger.info("User created", user_id=user.id)
+    return user
+
+
+async def update_user(
+    db: AsyncSession,
+    user_id: int,
+    *,
+    email: str | None = None,
+    username: str | None = None,
+    password: str | None = None,
+    is_active: bool | None = None,
+) -> User:
+    """
+    Update a user's fields. Fields left as None are unchanged.
+
+    Args:
+        db: Database session
+        user_id: Primary key of the user
+        email: New email address
+        username: New username
+        password: New plain text password
+        is_active: Activate or deactivate the account
+
+    Returns:
+        The updated User
+
+    Raises:
+        ResourceNotFoundError: If the user doesn't exist
+        ConflictError: If the new email or username is already taken
+    """
+    user = await db.get(User, user_id)
+    if user is None:
+        raise ResourceNotFoundError(resource="User", resource_id=user_id)
+
+    if email is not None:
+        user.email = email
+    if username is not None:
+        user.username = username
+    if password is not None:
+        user.hashed_password = await hash_password_async(password)
+    if is_active is not None:
+        user.is_active = is_active
+
+    await _commit(db, email=email, username=username)
+    await db.refresh(user)
+
+    user_cache.invalidate(user_id)
+    logger.info("User updated", user_id=user_id)
+    return user
+
+
+async def deactivate_user(db: AsyncSession, user_id: int) -> User:
+    """
+    Deactivate a user so they can no longer authenticate.
+
+    Args:
+        db: Database session
+        user_id: Primary key of the user
+
+    Returns:
+        The deactivated User
+    """
+    return await update_user(db, user_id, is_active=False)
+
+
+async def _commit(db: AsyncSession, **details: str | None) -> None:
+    """Commit, translating unique-index violations into ConflictError."""
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise ConflictError(
+            message="Email or username already registered",
+            details={key: value for key, value in details.items() if value},
+        )
@@ -0,0 +1,3 @@
+"""
+Micro-benchmarks and load tests. Run modules with `python -m benchmarks.<name>`.
+"""
@@ -0,0 +1,347 @@
+"""
+API latency and throughput benchmark.
+
+    python -m benchmarks.bench_api [--target inprocess|uvicorn|all]
+        [--concurrency 1,16,64] [--requests 400]
+        [--database-url URL] [--baseline PATH] [--save-baseline]
+
+Runs each scenario (login, register, /users/me, /users/{id}, /metrics) at
+fixed concurrency levels, either in-process over httpx's ASGITransport or
+against a local uvicorn worker (uvloop/httptools), and reports throughput
+and p50/p95/p99 latency.
+
+The database defaults to a throwaway SQLite file (aiosqlite); pass a
+PostgreSQL URL to benchmark against a real server. Tables are created and
+seeded on start. Logging stays on (console output is discarded) so its
+cost is included; Sentry and tracing are off unless --observability is
+given.
+
+Results are compared against benchmarks/baseline_api.json: a scenario is a
+regression when p95 grows, or throughput drops, by more than --tolerance.
+The exit code is 1 if any regression is found. Baselines are machine
+specific; regenerate with --save-baseline on the reference machine.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+import httpx
+
+BASELINE = Path(__file__).with_name("baseline_api.json")
+PASSWORD = "bench-password"
+SEED_USERS = 100
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    method: str
+    path: Callable[[int], str]
+    body: Callable[[int], dict[str, Any]] | None = None
+    authenticated: bool = False
+    # Share of --requests to run; bcrypt-bound scenarios are much slower
+    weight: float = 1.0
+
+
+_register_ids = itertools.count()
+
+SCENARIOS = [
+    Scenario(
+        "login",
+        "POST",
+        lambda i: "/api/v1/auth/login",
+        lambda i: {"email": "bench@example.com", "password": PASSWORD},
+        weight=0.1,
+    ),
+    Scenario(
+        "register",
+        "POST",
+        lambda i: "/api/v1/auth/register",
+        lambda i: {
+            "email": f"new-{os.getpid()}-{next(_register_ids)}@example.com",
+            "password": PASSWORD,
+        },
+        weight=0.1,
+    ),
+    Scenario("users_me", "GET", lambda i: "/api/v1/users/me", authenticated=True),
+    Scenario(
+        "user_by_id",
+        "GET",
+        lambda i: f"/api/v1/users/{i % SEED_USERS + 1}",
+        authenticated=True,
+    ),
+    Scenario("metrics", "GET", lambda i: "/metrics"),
+]
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    concurrency: int,
+    requests: int,
+    headers: dict[str, str],
+) -> dict[str, float]:
+    """Issue `requests` requests from `concurrency` concurrent clients."""
+    counter = itertools.count()
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        while (i := next(counter)) < requests:
+            body = scenario.body(i) if scenario.body else None
+            started = time.perf_counter()
+            response = await client.request(
+                scenario.method,
+                scenario.path(i),
+                json=body,
+                headers=headers if scenario.authenticated else None,
+            )
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+async def seed_database() -> None:
+    from app.core.security import hash_password
+    from app.db.base import Base
+    from app.db.session import dispose_engines, get_engine
+    from app.models.user import User
+
+    engine = get_engine()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    from app.db.session import async_session_maker
+
+    hashed = hash_password(PASSWORD)
+    async with async_session_maker() as session:
+        session.add_all(
+            User(
+                email="bench@example.com" if i == 0 else f"seed-{i}@example.com",
+                username=f"seed-{i}",
+                hashed_password=hashed,
+            )
+            for i in range(SEED_USERS)
+        )
+        await session.commit()
+    await dispose_engines()
+
+
+async def run_suite(
+    client: httpx.AsyncClient, concurrency_levels: list[int], requests: int
+) -> dict[str, dict[str, dict[str, float]]]:
+    response = await client.post(
+        "/api/v1/auth/login",
+        json={"email": "bench@example.com", "password": PASSWORD},
+    )
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    results: dict[str, dict[str, dict[str, float]]] = {}
+    for scenario in SCENARIOS:
+        count = max(1, int(requests * scenario.weight))
+        # Warm caches, pools and lazily built routes
+        await run_scenario(client, scenario, 4, min(count, 20), headers)
+        for concurrency in concurrency_levels:
+            result = await run_scenario(client, scenario, concurrency, count, headers)
+            results.setdefault(scenario.name, {})[str(concurrency)] = result
+            print_row(scenario.name, concurrency, result)
+    return results
+
+
+async def bench_inprocess(
+    concurrency_levels: list[int], requests: int
+) -> dict[str, Any]:
+    from app.core import logging as app_logging
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        if app_logging._listener is not None:
+            devnull = open(os.devnull, "w")
+            for handler in app_logging._listener.handlers:
+                if type(handler) is logging.StreamHandler:
+                    handler.setStream(devnull)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            return await run_suite(client, concurrency_levels, requests)
+
+
+async def bench_uvicorn(
+    concurrency_levels: list[int], requests: int, port: int
+) -> dict[str, Any]:
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(port),
+            "--loop",
+            "uvloop",
+            "--http",
+            "httptools",
+            "--no-access-log",
+            "--log-level",
+            "warning",
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    limits = httpx.Limits(max_connections=max(concurrency_levels))
+    try:
+        async with httpx.AsyncClient(
+            base_url=base_url, limits=limits, timeout=60
+        ) as client:
+            for _ in range(100):
+                try:
+                    if (await client.get("/healthz")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError("uvicorn did not start")
+            return await run_suite(client, concurrency_levels, requests)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def print_row(scenario: str, concurrency: int, result: dict[str, float]) -> None:
+    print(
+        f"  {scenario:<12} c={concurrency:<4} {result['throughput_rps']:>9,.1f} rps "
+        f"p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  "
+        f"p99 {result['p99_ms']:>8.2f}ms  errors {result['errors']:.0f}"
+    )
+
+
+def compare(
+    results: dict[str, Any], baseline: dict[str, Any], tolerance: float
+) -> list[str]:
+    """List the scenarios that regressed against the baseline."""
+    regressions = []
+    for target, scenarios in results.items():
+        for scenario, levels in scenarios.items():
+            for concurrency, result in levels.items():
+                base = baseline.get(target, {}).get(scenario, {}).get(concurrency)
+                if base is None:
+                    continue
+                key = f"{target}/{scenario}/c={concurrency}"
+                if result["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+                    regressions.append(
+                        f"{key}: p95 {base['p95_ms']}ms -> {result['p95_ms']}ms"
+                    )
+                if result["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+                    regressions.append(
+                        f"{key}: throughput {base['throughput_rps']} -> "
+                        f"{result['throughput_rps']} rps"
+                    )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--target", choices=["inprocess", "uvicorn", "all"], default="inprocess"
+    )
+    parser.add_argument("--concurrency", default="1,16,64")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--observability", action="store_true")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("-o", "--output", type=Path, help="Write results as JSON")
+    args = parser.parse_args()
+
+    # Settings are read when app modules are first imported, so configure
+    # the environment (inherited by the uvicorn process) before that
+    database_url = args.database_url or (
+        "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+    )
+    os.environ["SQLALCHEMY_DATABASE_URI"] = database_url
+    if not args.observability:
+        for toggle in ("SENTRY_ENABLED", "OTEL_ENABLED"):
+            os.environ.setdefault(toggle, "false")
+
+    # httpx logs every request at INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    concurrency_levels = [int(c) for c in args.concurrency.split(",")]
+    targets = ["inprocess", "uvicorn"] if args.target == "all" else [args.target]
+
+    asyncio.run(seed_database())
+
+    results: dict[str, Any] = {}
+    for target in targets:
+        print(target)
+        if target == "inprocess":
+            results[target] = asyncio.run(
+                bench_inprocess(concurrency_levels, args.requests)
+            )
+        else:
+            results[target] = asyncio.run(
+                bench_uvicorn(concurrency_levels, args.requests, args.port)
+            )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if args.baseline.exists():
+        regressions = compare(
+            results, json.loads(args.baseline.read_text()), args.tolerance
+        )
+        if regressions:
+            print("Regressions against baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Per-call cost of structured logging for each LOG_PROFILE.
+
+    python -m benchmarks.bench_logging [--calls 50000]
+
+For each profile the listener thread is paused while the calls are made,
+so "caller" is exactly what a request handler pays per log call. The
+listener is then restarted and the time to drain the queue is reported as
+"listener" (formatting + rendering + write, off the request path). Output
+goes to /dev/null.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+from app.core import logging as app_logging
+from app.core.config import settings
+
+PROFILES = ("standard", "performance")
+
+
+def run_profile(profile: str, calls: int) -> dict[str, float]:
+    settings.LOG_PROFILE = profile
+    settings.LOG_QUEUE_SIZE = calls + 1_000
+    app_logging._static_context.cache_clear()
+    app_logging.setup_logging()
+
+    listener = app_logging._listener
+    devnull = open(os.devnull, "w")
+    for handler in listener.handlers:
+        handler.setStream(devnull)
+
+    logger = app_logging.get_logger("benchmarks.logging")
+    for i in range(1_000):
+        logger.info("User authenticated", user_id=i)
+
+    listener.stop()
+    started = time.perf_counter_ns()
+    for i in range(calls):
+        logger.info("User authenticated", user_id=i)
+    caller_ns = (time.perf_counter_ns() - started) / calls
+
+    started = time.perf_counter_ns()
+    listener.start()
+    listener.stop()
+    listener_ns = (time.perf_counter_ns() - started) / calls
+
+    app_logging.stop_logging()
+    devnull.close()
+    return {"caller_ns": caller_ns, "listener_ns": listener_ns}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=50_000)
+    args = parser.parse_args()
+
+    print(f"{'profile':<12} {'caller ns/call':>15} {'listener ns/call':>17}")
+    for profile in PROFILES:
+        result = run_profile(profile, args.calls)
+        print(
+            f"{profile:<12} {result['caller_ns']:>15,.0f} "
+            f"{result['listener_ns']:>17,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
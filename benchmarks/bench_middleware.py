@@ -0,0 +1,87 @@
+"""
+Per-request overhead of the HTTP metrics middleware.
+
+    python -m benchmarks.bench_middleware [--requests 5000]
+
+Drives a bare FastAPI app in-process over httpx's ASGITransport with no
+middleware, the previous `@app.middleware("http")` hook
+(BaseHTTPMiddleware) and the pure ASGI MetricsMiddleware, and reports the
+mean time per request and the overhead over the bare app.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+
+import httpx
+from fastapi import FastAPI, Request
+
+from app.core.metrics import HTTP_LATENCY, HTTP_REQUESTS
+from app.core.middleware import MetricsMiddleware
+
+
+def build_app(variant: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        return {"id": item_id}
+
+    if variant == "base_http":
+
+        @app.middleware("http")
+        async def metrics_middleware(request: Request, call_next):
+            start = time.perf_counter()
+            response = await call_next(request)
+            duration = time.perf_counter() - start
+
+            route = request.scope.get("route")
+            path = route.path if route else "unknown"
+            HTTP_REQUESTS.labels(request.method, path, response.status_code).inc()
+            HTTP_LATENCY.labels(request.method, path).observe(duration)
+            return response
+
+    elif variant == "asgi":
+        app.add_middleware(MetricsMiddleware)
+
+    return app
+
+
+async def run_variant(variant: str, requests: int) -> float:
+    transport = httpx.ASGITransport(app=build_app(variant))
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        for i in range(500):
+            await client.get(f"/items/{i}")
+
+        started = time.perf_counter_ns()
+        for i in range(requests):
+            await client.get(f"/items/{i}")
+        return (time.perf_counter_ns() - started) / requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5_000)
+    args = parser.parse_args()
+
+    # httpx logs every request at INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    results = {
+        variant: asyncio.run(run_variant(variant, args.requests))
+        for variant in ("none", "base_http", "asgi")
+    }
+
+    print(f"{'middleware':<12} {'us/request':>11} {'overhead us':>12}")
+    for variant, ns in results.items():
+        overhead = (ns - results["none"]) / 1_000
+        print(f"{variant:<12} {ns / 1_000:>11,.1f} {overhead:>12,.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Worker import and boot time.
+
+    python -m benchmarks.bench_startup [--runs 5]
+
+Each run starts a fresh interpreter, times `import app.main` (which builds
+the app via create_app) and then the lifespan startup and shutdown, i.e.
+what a uvicorn worker pays before it can serve. The median of the runs is
+reported. The lifespan doesn't wait for the database, so any
+SQLALCHEMY_DATABASE_URI works (e.g. sqlite+aiosqlite:///:memory:).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+CHILD = """
+import asyncio, json, time
+
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+
+async def boot():
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+    return ready, time.perf_counter()
+
+
+ready, stopped = asyncio.run(boot())
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "shutdown_ms": (stopped - ready) * 1000,
+}))
+"""
+
+PHASES = ("import_ms", "startup_ms", "shutdown_ms")
+
+
+def run_once() -> dict[str, float]:
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+
+    print(f"{'phase':<12} {'median ms':>10} {'min ms':>8} {'max ms':>8}")
+    for phase in PHASES:
+        values = [run[phase] for run in runs]
+        print(
+            f"{phase:<12} {statistics.median(values):>10,.1f} "
+            f"{min(values):>8,.1f} {max(values):>8,.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import inspect
+import os
+from pathlib import Path
+from unittest import mock
+
+import pytest
+import uvicorn
+
+from app import cli
+
+
+@pytest.fixture(autouse=True)
+def environ():
+    """Restore the environment, which start() sets PROMETHEUS_MULTIPROC_DIR in."""
+    with mock.patch.dict(os.environ):
+        os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+        yield
+
+
+def run_start(monkeypatch, *argv):
+    calls = []
+    monkeypatch.setattr(cli.uvicorn, "run", lambda *a, **kw: calls.append((a, kw)))
+    monkeypatch.setattr("sys.argv", ["start", *argv])
+    cli.start()
+    ((args, kwargs),) = calls
+    # Every option must exist in the installed uvicorn
+    inspect.signature(uvicorn.run).bind(*args, **kwargs)
+    return kwargs
+
+
+def test_development_mode_reloads(monkeypatch):
+    kwargs = run_start(monkeypatch)
+    assert kwargs["reload"] is True
+    assert "workers" not in kwargs
+
+
+def test_production_mode(monkeypatch, tmp_path):
+    metrics_dir = tmp_path / "metrics"
+    monkeypatch.setattr(cli.settings, "SERVER_METRICS_DIR", str(metrics_dir))
+    monkeypatch.setattr(cli, "available_cpus", lambda: 3)
+
+    kwargs = run_start(monkeypatch, "--prod", "--limit-max-requests", "1000")
+
+    assert kwargs["workers"] == 3
+    assert kwargs["limit_max_requests"] == 1000
+    assert kwargs["loop"] == "uvloop"
+    assert "reload" not in kwargs
+    # Workers share a prepared multiprocess metrics directory
+    assert os.environ["PROMETHEUS_MULTIPROC_DIR"] == str(metrics_dir)
+    assert metrics_dir.is_dir()
+
+
+def test_single_worker_needs_no_metrics_dir(monkeypatch):
+    kwargs = run_start(monkeypatch, "--prod", "--workers", "1")
+    assert kwargs["workers"] == 1
+    assert "PROMETHEUS_MULTIPROC_DIR" not in os.environ
+
+
+def test_temporary_metrics_dir_is_removed_on_exit(monkeypatch):
+    cleanups = []
+    monkeypatch.setattr(cli.settings, "SERVER_METRICS_DIR", None)
+    monkeypatch.setattr(cli.atexit, "register", lambda *a, **kw: cleanups.append(a))
+
+    run_start(monkeypatch, "--prod", "--workers", "2")
+
+    metrics_dir = Path(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+    assert metrics_dir.is_dir()
+    ((rmtree, path),) = cleanups
+    rmtree(path)
+    assert not metrics_dir.exists()
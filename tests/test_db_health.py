@@ -0,0 +1,87 @@
+import asyncio
+import threading
+
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.health import DatabaseHealthMonitor, db_health
+from app.main import app
+
+
+def make_monitor(url, **pool_options):
+    engine = create_async_engine(url, **pool_options)
+    return DatabaseHealthMonitor(
+        interval=60, timeout=0.2, max_connections=5, engine=engine
+    )
+
+
+def test_healthy_database(tmp_path):
+    monitor = make_monitor(f"sqlite+aiosqlite:///{tmp_path}/db.sqlite")
+
+    async def scenario():
+        assert await monitor.check() is True
+        await monitor.engine.dispose()
+
+    asyncio.run(scenario())
+    assert monitor.status()["last_error"] is None
+
+
+def test_unreachable_database_is_unhealthy(tmp_path):
+    monitor = make_monitor(f"sqlite+aiosqlite:///{tmp_path}/missing/db.sqlite")
+
+    async def scenario():
+        healthy = await monitor.check()
+        # aiosqlite stops the thread of a failed connection without waiting;
+        # let it finish before the loop closes
+        while any(
+            "_connection_worker_thread" in thread.name
+            for thread in threading.enumerate()
+        ):
+            await asyncio.sleep(0.01)
+        return healthy
+
+    assert asyncio.run(scenario()) is False
+    assert "OperationalError" in monitor.last_error
+
+
+def test_saturated_pool_is_not_a_failure(tmp_path):
+    monitor = make_monitor(
+        f"sqlite+aiosqlite:///{tmp_path}/db.sqlite", pool_size=1, max_overflow=0
+    )
+
+    async def scenario():
+        assert await monitor.check() is True
+        # dispose() would replace the pool
+        pool = monitor.engine.sync_engine.pool
+
+        async with monitor.engine.connect():
+            # Every connection is busy: the check is skipped
+            assert await monitor.check() is True
+            assert monitor.pool_saturated is True
+            # A ping waiting for a connection times out as saturation
+            assert await monitor._ping() == "saturated"
+
+        assert await monitor.check() is True
+        assert monitor.pool_saturated is False
+        assert monitor.engine.sync_engine.pool is pool
+        await monitor.engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_readyz_reports_cached_health(monkeypatch):
+    client = TestClient(app)
+
+    monkeypatch.setattr(db_health, "healthy", True)
+    response = client.get("/readyz")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+    monkeypatch.setattr(db_health, "healthy", False)
+    monkeypatch.setattr(db_health, "last_error", "OperationalError: down")
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["database"]["last_error"] == "OperationalError: down"
+
+    monkeypatch.setattr(db_health, "healthy", None)
+    assert client.get("/readyz").status_code == 503
@@ -0,0 +1,29 @@
+import pytest
+import structlog
+
+from app.core.log_sampling import EventSampler
+
+
+def _run(sampler, event, level="info"):
+    try:
+        return sampler(None, level, {"event": event, "level": level})
+    except structlog.DropEvent:
+        return None
+
+
+def test_sampling_keeps_one_in_n_and_warnings():
+    sampler = EventSampler({"hot": 10}, {}, report_interval=3600)
+
+    kept = [_run(sampler, "hot") for _ in range(30)]
+    assert sum(1 for e in kept if e is not None) == 3
+    assert kept[0]["sample_rate"] == 10
+    assert _run(sampler, "hot", level="warning") is not None
+    assert _run(sampler, "cold") is not None
+    assert sampler._suppressed == {"hot": 27}
+
+
+def test_rate_limit_caps_events_per_second():
+    sampler = EventSampler({}, {"hot": 5}, report_interval=3600)
+
+    kept = [_run(sampler, "hot") for _ in range(20)]
+    assert sum(1 for e in kept if e is not None) == pytest.approx(5, abs=1)
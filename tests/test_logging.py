@@ -0,0 +1,72 @@
+import logging
+import queue
+import threading
+import time
+
+from prometheus_client import REGISTRY
+
+from app.core.logging import BoundedQueueHandler
+
+
+def dropped(level):
+    value = REGISTRY.get_sample_value("log_records_dropped_total", {"level": level})
+    return value or 0.0
+
+
+def record(message, level=logging.INFO):
+    return logging.LogRecord("test", level, __file__, 1, message, None, None)
+
+
+def fill(policy, *levels):
+    """A handler on a two-slot queue, already holding one record per level."""
+    handler = BoundedQueueHandler(queue.Queue(maxsize=2), policy)
+    for index, level in enumerate(levels):
+        handler.handle(record(f"old-{index}", level))
+    return handler
+
+
+def drain(handler):
+    messages = []
+    while not handler.queue.empty():
+        messages.append(handler.queue.get_nowait().msg)
+    return messages
+
+
+def test_drop_new_discards_the_incoming_record():
+    handler = fill("drop_new", logging.INFO, logging.INFO)
+    before = dropped("WARNING")
+
+    handler.handle(record("new", logging.WARNING))
+
+    assert drain(handler) == ["old-0", "old-1"]
+    assert dropped("WARNING") == before + 1
+
+
+def test_drop_oldest_makes_room_for_the_incoming_record():
+    handler = fill("drop_oldest", logging.DEBUG, logging.INFO)
+    before = dropped("DEBUG"), dropped("ERROR")
+
+    handler.handle(record("new", logging.ERROR))
+
+    assert drain(handler) == ["old-1", "new"]
+    # The evicted record is the one counted
+    assert (dropped("DEBUG"), dropped("ERROR")) == (before[0] + 1, before[1])
+
+
+def test_block_waits_for_room_and_drops_nothing():
+    handler = fill("block", logging.INFO, logging.INFO)
+    before = dropped("CRITICAL")
+
+    thread = threading.Thread(
+        target=handler.handle, args=(record("new", logging.CRITICAL),)
+    )
+    thread.start()
+    time.sleep(0.05)
+    assert thread.is_alive()
+
+    assert handler.queue.get_nowait().msg == "old-0"
+    thread.join(timeout=1)
+    assert not thread.is_alive()
+
+    assert drain(handler) == ["old-1", "new"]
+    assert dropped("CRITICAL") == before
@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from app import main
+from app.api.deps import get_current_superuser
+from app.core.config import Settings, settings
+from app.core.metrics import exposition_cache
+from app.core.profiler import profiler
+from app.core.security import token_cache
+from app.core.watchdog import loop_watchdog
+from app.db.health import db_health
+from app.main import _configure_services
+from app.services.user_cache import user_cache
+
+
+def test_services_follow_the_app_settings():
+    custom = Settings(
+        DB_HEALTH_CHECK_INTERVAL_SECONDS=11,
+        WATCHDOG_STALL_THRESHOLD_SECONDS=3,
+        USER_CACHE_TTL_SECONDS=7,
+        JWT_CACHE_MAX_SIZE=12,
+        METRICS_CACHE_SECONDS=9,
+        DEBUG_PROFILE_INTERVAL_MS=20,
+    )
+    try:
+        _configure_services(custom)
+        assert db_health.interval == 11
+        assert loop_watchdog.threshold == 3
+        assert user_cache.ttl == 7
+        assert token_cache.max_size == 12
+        assert exposition_cache.ttl == 9
+        assert profiler.interval == 0.02
+    finally:
+        _configure_services(settings)
+
+    assert user_cache.ttl == settings.USER_CACHE_TTL_SECONDS
+
+
+def test_sentry_is_set_up_before_the_routes_are_built(monkeypatch):
+    calls = []
+
+    class RecordingFastAPI(main.FastAPI):
+        def __init__(self, *args, **kwargs):
+            calls.append("app")
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(main, "FastAPI", RecordingFastAPI)
+    monkeypatch.setattr(main, "_setup_sentry", lambda _: calls.append("sentry"))
+
+    main.create_app(
+        Settings(SENTRY_ENABLED=True, SENTRY_DSN="https://key@example.com/1")
+    )
+    assert calls == ["sentry", "app"]
+
+
+def test_request_limits_come_from_the_app_settings():
+    app = main.create_app(Settings(DEBUG_PROFILE_MAX_SECONDS=2))
+    app.dependency_overrides[get_current_superuser] = lambda: SimpleNamespace(id=1)
+    client = TestClient(app)
+
+    response = client.get("/debug/profile", params={"seconds": 3})
+    assert response.status_code == 422
+    assert response.json()["details"] == {"max_seconds": 2}
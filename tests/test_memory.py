@@ -0,0 +1,23 @@
+from app.core.memory import MemoryTracker
+
+
+def test_diff_reports_growth_by_line():
+    tracker = MemoryTracker(frames=5, top_n=10, max_snapshots=2)
+    tracker.start()
+    try:
+        tracker.take_snapshot("before")
+        retained = [bytearray(1024) for _ in range(1000)]  # noqa: F841
+        sites = tracker.diff("before")
+
+        top = sites[0]
+        assert top["file"] == __file__
+        assert top["size_diff"] >= 1000 * 1024
+        assert top["count_diff"] >= 1000
+
+        tracker.take_snapshot("after")
+        tracker.take_snapshot("latest")
+        # Oldest snapshot is dropped past max_snapshots
+        assert tracker.status()["snapshots"] == ["after", "latest"]
+    finally:
+        tracker.stop()
+    assert tracker.status() == {"tracing": False, "snapshots": []}
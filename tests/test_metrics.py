@@ -0,0 +1,98 @@
+import asyncio
+import os
+import subprocess
+import sys
+import textwrap
+import time
+
+from app.core import metrics
+from app.core.metrics import ExpositionCache, prepare_multiprocess_dir
+
+WORKER = """
+from app.core import metrics
+metrics.HTTP_REQUESTS.labels("GET", "/x", "200").inc()
+metrics.HTTP_REQUESTS_IN_FLIGHT.inc()
+"""
+
+SCRAPE = """
+from prometheus_client.core import GaugeMetricFamily
+from app.core import metrics
+
+class Collector:
+    def collect(self):
+        yield GaugeMetricFamily("process_state", "In-process state", value=7)
+
+metrics.register_process_collector(Collector())
+print(sorted(metrics.cleanup_dead_workers()))
+print(metrics.render_metrics()[0].decode())
+"""
+
+
+def run(code, multiproc_dir):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(multiproc_dir)}
+    result = subprocess.run(
+        [sys.executable, "-c", textwrap.dedent(code)],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout
+
+
+def test_prepare_only_removes_metric_files(tmp_path):
+    (tmp_path / "counter_1.db").write_bytes(b"")
+    (tmp_path / "keep.txt").write_text("other data")
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "nested" / "gauge_livesum_1.db").write_bytes(b"")
+
+    prepare_multiprocess_dir(str(tmp_path))
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["keep.txt", "nested"]
+    assert (tmp_path / "nested" / "gauge_livesum_1.db").exists()
+    prepare_multiprocess_dir(str(tmp_path / "new"))
+    assert (tmp_path / "new").is_dir()
+
+
+def test_workers_are_aggregated_and_dead_ones_cleaned_up(tmp_path):
+    run(WORKER, tmp_path)
+    run(WORKER, tmp_path)
+
+    dead_pids, exposition = run(SCRAPE, tmp_path).split("\n", 1)
+
+    # Both workers exited: their live gauges are dropped, counters kept
+    dead_pids = eval(dead_pids)
+    assert len(dead_pids) == 2
+    for pid in dead_pids:
+        assert not list(tmp_path.glob(f"gauge_live*_{pid}.db"))
+    assert 'http_requests_total{method="GET",path="/x",status="200"} 2.0' in exposition
+    assert "http_requests_in_flight 0.0" in exposition
+    assert "process_state 7.0" in exposition
+
+
+def test_exposition_cache_renders_once_per_ttl(monkeypatch):
+    renders = []
+
+    def render(openmetrics):
+        renders.append(openmetrics)
+        # Slow enough for every concurrent scrape to miss the cache
+        time.sleep(0.05)
+        return f"render-{len(renders)}"
+
+    monkeypatch.setattr(metrics, "_render_exposition", render)
+    cache = ExpositionCache(ttl=0.2)
+
+    async def scenario():
+        first = await asyncio.gather(*(cache.get() for _ in range(10)))
+        cached = await cache.get()
+        openmetrics = await cache.get(openmetrics=True)
+        await asyncio.sleep(0.25)
+        expired = await asyncio.gather(cache.get(), cache.get())
+        return first, cached, openmetrics, expired
+
+    first, cached, openmetrics, expired = asyncio.run(scenario())
+    assert first == ["render-1"] * 10
+    assert cached == "render-1"
+    assert openmetrics == "render-2"
+    assert expired == ["render-3"] * 2
+    assert renders == [False, True, False]
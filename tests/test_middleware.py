@@ -0,0 +1,108 @@
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.trace import format_trace_id
+from prometheus_client import REGISTRY
+
+from app.core.config import settings
+from app.core.metrics import render_metrics
+from app.core.middleware import MetricsMiddleware
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def metrics_app():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    in_flight = []
+
+    @app.post("/echo/{item_id}")
+    async def echo(item_id: int, request: Request):
+        in_flight.append(sample("http_requests_in_flight"))
+        return {"id": item_id, "size": len(await request.body())}
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    return app, in_flight
+
+
+def test_requests_are_counted_sized_and_in_flight():
+    app, in_flight = metrics_app()
+    client = TestClient(app)
+    path = "/echo/{item_id}"
+    requests = sample("http_requests_total", method="POST", path=path, status="200")
+    request_bytes = sample("http_request_size_bytes_sum", path=path)
+    response_bytes = sample("http_response_size_bytes_sum", path=path)
+    sized = sample("http_response_size_bytes_count", path=path)
+    idle = sample("http_requests_in_flight")
+
+    response = client.post("/echo/7", content=b"x" * 150)
+
+    assert response.json() == {"id": 7, "size": 150}
+    assert in_flight == [idle + 1]
+    assert sample("http_requests_in_flight") == idle
+    assert (
+        sample("http_requests_total", method="POST", path=path, status="200")
+        == requests + 1
+    )
+    assert sample("http_request_size_bytes_sum", path=path) == request_bytes + 150
+    assert sample("http_response_size_bytes_sum", path=path) == response_bytes + len(
+        response.content
+    )
+    assert sample("http_response_size_bytes_count", path=path) == sized + 1
+
+
+def test_unhandled_errors_are_counted_as_500():
+    app, _ = metrics_app()
+    client = TestClient(app, raise_server_exceptions=False)
+    failures = sample("http_requests_total", method="GET", path="/boom", status="500")
+    idle = sample("http_requests_in_flight")
+
+    assert client.get("/boom").status_code == 500
+
+    assert (
+        sample("http_requests_total", method="GET", path="/boom", status="500")
+        == failures + 1
+    )
+    assert sample("http_requests_in_flight") == idle
+
+
+def test_latency_exemplar_carries_the_trace_id(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_EXEMPLARS", True)
+    tracer = TracerProvider().get_tracer(__name__)
+    trace_ids = []
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/traced")
+    async def traced():
+        return {}
+
+    class TracingMiddleware:
+        # Stands in for the OpenTelemetry middleware that wraps this one
+        def __init__(self, app):
+            self.app = app
+
+        async def __call__(self, scope, receive, send):
+            with tracer.start_as_current_span("request") as span:
+                trace_ids.append(format_trace_id(span.get_span_context().trace_id))
+                await self.app(scope, receive, send)
+
+    app.add_middleware(TracingMiddleware)
+
+    assert TestClient(app).get("/traced").status_code == 200
+
+    exposition = render_metrics(openmetrics=True)[0].decode()
+    buckets = [
+        line
+        for line in exposition.splitlines()
+        if line.startswith("http_request_duration_seconds_bucket")
+        and 'path="/traced"' in line
+        and " # " in line
+    ]
+    assert buckets
+    assert all(f'# {{trace_id="{trace_ids[0]}"}}' in line for line in buckets)
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.pool import InstrumentedAsyncQueuePool, instrument_pool
+
+
+def sample(name, pool):
+    return REGISTRY.get_sample_value(name, {"pool": pool}) or 0.0
+
+
+def test_saturated_pool_counts_timeouts_and_waits(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/db.sqlite",
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+        pool_logging_name="saturated",
+    )
+    instrument_pool(engine, "saturated")
+    waits = sample("db_pool_checkout_wait_seconds_count", "saturated")
+    waited = sample("db_pool_checkout_wait_seconds_sum", "saturated")
+    timeouts = sample("db_pool_checkout_timeouts_total", "saturated")
+
+    async def scenario():
+        async with engine.connect():
+            assert sample("db_pool_checked_out_connections", "saturated") == 1
+            with pytest.raises(sa_exc.TimeoutError):
+                async with engine.connect():
+                    pass
+        assert sample("db_pool_checked_out_connections", "saturated") == 0
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+    assert sample("db_pool_checkout_timeouts_total", "saturated") == timeouts + 1
+    # Both checkouts are timed, the one that timed out included
+    assert sample("db_pool_checkout_wait_seconds_count", "saturated") == waits + 2
+    assert sample("db_pool_checkout_wait_seconds_sum", "saturated") - waited >= 0.1
+
+
+def test_overflow_gauge_drops_when_overflow_connections_close(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/db.sqlite",
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_logging_name="overflowing",
+    )
+    instrument_pool(engine, "overflowing")
+
+    async def scenario():
+        async with engine.connect():
+            async with engine.connect():
+                assert sample("db_pool_checked_out_connections", "overflowing") == 2
+                assert sample("db_pool_overflow_connections", "overflowing") == 1
+            # Returned to the empty pool: still open
+            assert sample("db_pool_checked_out_connections", "overflowing") == 1
+            assert sample("db_pool_overflow_connections", "overflowing") == 1
+        # The pool was full, so this connection was closed
+        assert sample("db_pool_checked_out_connections", "overflowing") == 0
+        assert sample("db_pool_overflow_connections", "overflowing") == 0
+        await engine.dispose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,69 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_current_superuser
+from app.core.config import Settings
+from app.core.profiler import profiler
+from app.main import create_app
+
+
+def profiled_client():
+    """An app with a loop-blocking route and an admin override."""
+    app = create_app(Settings())
+    app.dependency_overrides[get_current_superuser] = lambda: SimpleNamespace(id=1)
+
+    @app.get("/slow/{item_id}")
+    async def slow(item_id: int):
+        time.sleep(0.3)  # blocks the loop
+        return {"id": item_id}
+
+    return TestClient(app)
+
+
+def start_profile(client, seconds):
+    """Run /debug/profile on a thread; returns the thread and its response."""
+    responses = []
+    thread = threading.Thread(
+        target=lambda: responses.append(
+            client.get("/debug/profile", params={"seconds": seconds})
+        )
+    )
+    thread.start()
+    deadline = time.monotonic() + 5
+    while not profiler.running and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert profiler.running
+    return thread, responses
+
+
+def test_profile_tags_stacks_with_their_route():
+    client = profiled_client()
+    thread, responses = start_profile(client, seconds=1)
+
+    assert client.get("/slow/7").json() == {"id": 7}
+    thread.join(timeout=5)
+
+    response = responses[0]
+    assert response.status_code == 200
+    assert int(response.headers["X-Profile-Samples"]) > 0
+    slow_stacks = [
+        line
+        for line in response.text.splitlines()
+        if line.startswith("route:GET /slow/{item_id};")
+    ]
+    assert slow_stacks
+    assert any("slow (" in line for line in slow_stacks)
+
+
+def test_concurrent_profile_is_rejected():
+    client = profiled_client()
+    thread, responses = start_profile(client, seconds=0.5)
+
+    response = client.get("/debug/profile", params={"seconds": 0.1})
+    thread.join(timeout=5)
+
+    assert response.status_code == 409
+    assert responses[0].status_code == 200
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.query_stats import QueryStatsCollector, fingerprint, parameter_shapes
+
+
+def test_fingerprint_normalizes_literals_params_and_lists():
+    assert fingerprint(
+        "SELECT users.id FROM users\n"
+        "WHERE users.id IN ($1, $2, $3) AND users.email = 'a@b.c' -- note\n"
+        "LIMIT 10"
+    ) == fingerprint(
+        "SELECT users.id FROM users WHERE users.id IN ($1) "
+        "AND users.email = 'x' LIMIT 50"
+    )
+    assert (
+        fingerprint("INSERT INTO t (a, b) VALUES (?, ?), (?, ?), (?, ?)")
+        == "INSERT INTO t (a, b) VALUES (...), ..."
+    )
+    # Casts and identifiers with digits are kept
+    assert fingerprint("SELECT anon_1.x::int FROM anon_1 WHERE y = :y_1") == (
+        "SELECT anon_1.x::int FROM anon_1 WHERE y = ?"
+    )
+
+
+def test_parameter_shapes_hide_values():
+    assert parameter_shapes({"email": "a@b.c", "ids": [1, 2]}) == {
+        "email": "str",
+        "ids": "list[2]",
+    }
+    assert parameter_shapes([(1, "x"), (2, "y")], executemany=True) == {
+        "rows": 2,
+        "shape": ["int", "str"],
+    }
+
+
+def test_totals_and_bounded_table():
+    stats = QueryStatsCollector(slow_threshold=1, max_fingerprints=2, top_n=1)
+    stats.record("SELECT * FROM a WHERE id = $1", 0.5, 1)
+    stats.record("SELECT * FROM a WHERE id = $2", 1.5, 3)
+    stats.record("SELECT * FROM b", 0.1, 10)
+    # Table is full: the cheapest fingerprint is evicted
+    stats.record("SELECT * FROM c", 0.2, 0)
+
+    assert [s.fingerprint for s in stats.top(limit=5)] == [
+        "SELECT * FROM a WHERE id = ?",
+        "SELECT * FROM c",
+    ]
+    a = stats.top()[0]
+    assert (a.calls, a.total_time, a.max_time, a.rows) == (2, 2.0, 1.5, 4)
+
+    families = {family.name: family for family in stats.collect()}
+    assert len(families["db_query_calls"].samples) == 1  # top_n only
+
+
+def test_failing_statement_keeps_the_database_error():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    stats = QueryStatsCollector(slow_threshold=60, max_fingerprints=10, top_n=10)
+    stats.instrument(engine, "test")
+
+    async def scenario():
+        async with engine.begin() as conn:
+            await conn.exec_driver_sql("CREATE TABLE t (id INTEGER PRIMARY KEY)")
+            await conn.exec_driver_sql("INSERT INTO t (id) VALUES (1), (2)")
+            with pytest.raises(IntegrityError):
+                await conn.exec_driver_sql("INSERT INTO t (id) VALUES (1)")
+            await conn.exec_driver_sql("SELECT id FROM t")
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+    by_fingerprint = {s.fingerprint: s for s in stats.top(limit=10)}
+    insert = by_fingerprint["INSERT INTO t (id) VALUES (...), ..."]
+    assert (insert.calls, insert.rows) == (1, 2)
+    # The failed insert isn't recorded
+    assert "INSERT INTO t (id) VALUES (...)" not in by_fingerprint
+    # SQLite doesn't report a row count for SELECTs
+    select = by_fingerprint["SELECT id FROM t"]
+    assert (select.rows, select.rows_unknown) == (0, 1)
@@ -0,0 +1,125 @@
+import asyncio
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.middleware import READ_YOUR_WRITES_COOKIE, ReadYourWritesMiddleware
+from app.db.base import Base
+from app.db.session import (
+    PrimarySession,
+    ReplicaRouter,
+    async_session_maker,
+    replica_router,
+)
+from app.models.user import User
+from app.services.user_loader import get_user_loader
+
+
+def make_router(replicas=2, read_after_write=60.0):
+    primary = async_sessionmaker(create_async_engine("sqlite+aiosqlite://"))
+    engines = [create_async_engine("sqlite+aiosqlite://") for _ in range(replicas)]
+    return ReplicaRouter(primary, read_after_write, engines), engines
+
+
+def bound_engine(maker):
+    return maker.kw["bind"]
+
+
+def test_without_replicas_reads_use_the_primary():
+    router, _ = make_router(replicas=0)
+    assert router.session_maker() is router.primary_maker
+
+
+def test_reads_round_robin_over_healthy_replicas():
+    router, (first, second) = make_router()
+    picked = [bound_engine(router.session_maker()) for _ in range(4)]
+    assert picked == [first, second, first, second]
+
+    router._set_health(first, False)
+    assert {bound_engine(router.session_maker()) for _ in range(4)} == {second}
+
+    router._set_health(second, False)
+    assert router.session_maker() is router.primary_maker
+
+
+def test_writes_only_pin_their_own_client_to_the_primary():
+    router, _ = make_router()
+
+    # Outside a client scope a write doesn't move anyone's reads
+    router.note_primary_write()
+    assert router.session_maker() is not router.primary_maker
+
+    with router.read_your_writes() as client:
+        assert router.session_maker() is not router.primary_maker
+        router.note_primary_write()
+        assert client.wrote
+        assert client.primary_until > time.time() + 59
+        assert router.session_maker() is router.primary_maker
+
+    with router.read_your_writes() as other_client:
+        assert not other_client.wrote
+        assert router.session_maker() is not router.primary_maker
+
+    with router.read_your_writes(primary_until=time.time() - 1):
+        assert router.session_maker() is not router.primary_maker
+
+
+def test_primary_commit_is_recorded_in_the_client_scope():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    maker = async_sessionmaker(engine, sync_session_class=PrimarySession)
+
+    async def scenario():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        with replica_router.read_your_writes() as reader:
+            async with maker() as session:
+                await session.execute(select(User))
+                await session.commit()
+        with replica_router.read_your_writes() as writer:
+            async with maker() as session:
+                session.add(User(email="a@x.io", username="a", hashed_password="h"))
+                await session.commit()
+        await engine.dispose()
+        return reader, writer
+
+    reader, writer = asyncio.run(scenario())
+    assert not reader.wrote
+    assert writer.wrote
+
+
+def test_middleware_carries_the_pin_across_requests():
+    router, _ = make_router()
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware, router=router)
+
+    @app.post("/write")
+    async def write():
+        router.note_primary_write()
+
+    @app.get("/read")
+    async def read():
+        return {"primary": router.session_maker() is router.primary_maker}
+
+    client = TestClient(app)
+    assert client.get("/read").json() == {"primary": False}
+
+    response = client.post("/write")
+    assert READ_YOUR_WRITES_COOKIE in response.cookies
+    assert "Max-Age=60" in response.headers["set-cookie"]
+    assert client.get("/read").json() == {"primary": True}
+
+    # Another client (no cookie) keeps reading from the replicas
+    assert TestClient(app).get("/read").json() == {"primary": False}
+
+    client.cookies.set(READ_YOUR_WRITES_COOKIE, str(time.time() - 1))
+    assert client.get("/read").json() == {"primary": False}
+
+
+def test_user_lookups_for_authentication_read_the_primary():
+    async def scenario():
+        return get_user_loader().session_factory
+
+    assert asyncio.run(scenario()) is async_session_maker
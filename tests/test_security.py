@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from app.core.security import hash_password_async, verify_password_async
+
+
+def test_password_hash_roundtrip_async():
+    async def roundtrip():
+        hashed = await hash_password_async("s3cret")
+        return (
+            await verify_password_async("s3cret", hashed),
+            await verify_password_async("wrong", hashed),
+        )
+
+    assert asyncio.run(roundtrip()) == (True, False)
+
+
+def test_decode_token_cache_misses_after_secret_rotation(monkeypatch):
+    from jose import JWTError
+
+    from app.core.config import settings
+    from app.core.security import create_access_token, decode_token, token_cache
+
+    token_cache.clear()
+    token = create_access_token({"sub": "42"})
+    assert decode_token(token)["sub"] == "42"
+    assert decode_token(token)["sub"] == "42"
+    assert len(token_cache) == 1
+
+    monkeypatch.setattr(settings, "JWT_SECRET", "rotated-secret")
+    with pytest.raises(JWTError):
+        decode_token(token)
+
+
+def test_decode_token_follows_the_configured_cache_size(monkeypatch):
+    from app.core.config import settings
+    from app.core.security import create_access_token, decode_token, token_cache
+
+    token_cache.clear()
+    token = create_access_token({"sub": "7"})
+
+    # The app's settings disable the cache although the global ones don't
+    monkeypatch.setattr(token_cache, "max_size", 0)
+    assert decode_token(token)["sub"] == "7"
+    assert len(token_cache) == 0
+
+    monkeypatch.setattr(settings, "JWT_CACHE_MAX_SIZE", 0)
+    monkeypatch.setattr(token_cache, "max_size", 10)
+    assert decode_token(token)["sub"] == "7"
+    assert len(token_cache) == 1
+    token_cache.clear()
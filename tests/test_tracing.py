@@ -0,0 +1,45 @@
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from opentelemetry.trace import StatusCode
+
+from app.core.config import Settings
+from app.core.tracing import ErrorTraceProcessor, build_sampler
+
+
+def test_unsampled_traces_are_exported_only_when_they_fail():
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider(sampler=build_sampler(0.0, {"/metrics": 0.0}, True))
+    provider.add_span_processor(ErrorTraceProcessor(SimpleSpanProcessor(exporter)))
+    tracer = provider.get_tracer(__name__)
+
+    with tracer.start_as_current_span("ok", attributes={"http.target": "/users"}):
+        with tracer.start_as_current_span("query"):
+            pass
+    with tracer.start_as_current_span("scrape", attributes={"http.target": "/metrics"}):
+        pass
+    assert exporter.get_finished_spans() == ()
+
+    with tracer.start_as_current_span("fail", attributes={"http.target": "/users"}):
+        with tracer.start_as_current_span("query") as span:
+            span.set_status(StatusCode.ERROR)
+
+    spans = exporter.get_finished_spans()
+    assert [span.name for span in spans] == ["query", "fail"]
+    assert all(span.context.trace_flags.sampled for span in spans)
+
+
+def test_unsampled_requests_are_not_recorded_by_default():
+    defaults = Settings()
+    sampler = build_sampler(
+        0.0,
+        defaults.OTEL_TRACES_ROUTE_SAMPLE_RATIOS,
+        defaults.OTEL_TRACES_ALWAYS_SAMPLE_ERRORS,
+    )
+    tracer = TracerProvider(sampler=sampler).get_tracer(__name__)
+
+    with tracer.start_as_current_span("request", attributes={"http.target": "/users"}):
+        with tracer.start_as_current_span("query") as span:
+            assert not span.is_recording()
@@ -0,0 +1,89 @@
+import asyncio
+
+from app.services.user_cache import UserCache
+
+
+def test_cold_key_is_loaded_once_and_misses_are_cached():
+    calls = []
+
+    async def loader(user_id):
+        calls.append(user_id)
+        await asyncio.sleep(0.01)
+        return None
+
+    async def scenario():
+        cache = UserCache(loader, ttl=60, negative_ttl=60, max_size=10)
+        results = await asyncio.gather(*[cache.get(7) for _ in range(20)])
+        assert results == [None] * 20
+        assert await cache.get(7) is None
+        return cache
+
+    asyncio.run(scenario())
+    assert calls == [7]
+
+
+def test_invalidate_during_load_does_not_cache_stale_row():
+    calls = []
+
+    async def loader(user_id):
+        calls.append(user_id)
+        await asyncio.sleep(0.01)
+        return f"user-{len(calls)}"
+
+    async def scenario():
+        cache = UserCache(loader, ttl=60, negative_ttl=60, max_size=10)
+        pending = asyncio.ensure_future(cache.get(1))
+        await asyncio.sleep(0)
+        cache.invalidate(1)
+        assert await pending == "user-1"
+        assert await cache.get(1) == "user-2"
+        assert await cache.get(1) == "user-2"
+
+    asyncio.run(scenario())
+    assert calls == [1, 1]
+
+
+def test_failed_load_is_retried_and_cached_afterwards():
+    calls = []
+
+    async def loader(user_id):
+        calls.append(user_id)
+        await asyncio.sleep(0.01)
+        if len(calls) == 1:
+            raise RuntimeError("database down")
+        return "user"
+
+    async def scenario():
+        cache = UserCache(loader, ttl=60, negative_ttl=60, max_size=10)
+        pending = asyncio.ensure_future(cache.get(1))
+        await asyncio.sleep(0)
+        cache.invalidate(1)
+        try:
+            await pending
+        except RuntimeError:
+            pass
+        assert cache._stale == set()
+        assert await cache.get(1) == "user"
+        assert await cache.get(1) == "user"
+
+    asyncio.run(scenario())
+    assert calls == [1, 1]
+
+
+def test_max_age_reloads_entries_that_have_not_expired():
+    calls = []
+
+    async def loader(user_id):
+        calls.append(user_id)
+        return f"user-{len(calls)}"
+
+    async def scenario():
+        cache = UserCache(loader, ttl=60, negative_ttl=60, max_size=10)
+        assert await cache.get(1) == "user-1"
+        assert await cache.get(1, max_age=60) == "user-1"
+        await asyncio.sleep(0.02)
+        assert await cache.get(1, max_age=0.01) == "user-2"
+        assert await cache.get(1) == "user-2"
+
+    asyncio.run(scenario())
+    assert calls == [1, 1]
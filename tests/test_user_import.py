@@ -0,0 +1,111 @@
+import asyncio
+
+from app.core.config import settings
+from app.core.security import verify_password
+from app.schemas.user import UserImportReport
+from app.services import user_import
+from app.services.user_import import _iter_rows, _validate_batch
+
+
+def parse(data: bytes, import_format="csv", chunk_size=7):
+    async def chunks():
+        for i in range(0, len(data), chunk_size):
+            yield data[i : i + chunk_size]
+
+    async def collect():
+        return [row async for row in _iter_rows(chunks(), import_format)]
+
+    return asyncio.run(collect())
+
+
+def test_csv_quoted_fields_may_span_lines_and_chunks():
+    data = (
+        b"email,username,password\r\n"
+        b'a@example.com,"multi\nline",pw-a\r\n'
+        b"\n"
+        b'"b@example.com","quo""ted",pw-b\n'
+        b'c@example.com,c,"pass,\n\nword"\n'
+        b"d@example.com,d,pw-d"
+    )
+
+    assert parse(data) == [
+        (2, {"email": "a@example.com", "username": "multi\nline", "password": "pw-a"}),
+        (5, {"email": "b@example.com", "username": 'quo"ted', "password": "pw-b"}),
+        (6, {"email": "c@example.com", "username": "c", "password": "pass,\n\nword"}),
+        (9, {"email": "d@example.com", "username": "d", "password": "pw-d"}),
+    ]
+
+
+def test_csv_unterminated_quote_runs_to_the_end():
+    data = b'email,password\na@example.com,"pw\nb@example.com,pw-b\n'
+
+    assert parse(data) == [
+        (2, {"email": "a@example.com", "password": "pw\nb@example.com,pw-b\n"}),
+    ]
+
+
+def test_undecodable_lines_are_invalid_rows():
+    csv_data = (
+        b"email,password\n"
+        b"a@example.com,\xff\n"
+        b'b@example.com,"pw\n\xfe"\n'
+        b"c@example.com,pw-c\n"
+    )
+    ndjson_data = b'{"email": "\xff"}\n{"email": "b@example.com"}\n'
+
+    assert parse(csv_data) == [
+        (2, None),
+        (3, None),
+        (5, {"email": "c@example.com", "password": "pw-c"}),
+    ]
+    assert parse(ndjson_data, "ndjson") == [(1, None), (2, {"email": "b@example.com"})]
+
+
+def test_ndjson_rows():
+    data = b'{"email": "a@example.com"}\n\nnot json\n[1]\n'
+
+    assert parse(data, "ndjson") == [
+        (1, {"email": "a@example.com"}),
+        (3, None),
+        (4, None),
+    ]
+
+
+def test_rows_over_the_column_lengths_are_rejected():
+    long_email = "a" * 250 + "@example.com"
+    batch = [
+        (2, {"email": "ok@example.com", "username": "ok", "password": "pw"}),
+        (3, {"email": long_email, "password": "pw"}),
+        (4, {"email": "b@example.com", "username": "b" * 256, "password": "pw"}),
+        (5, {"email": "c@example.com", "username": "c" * 255, "password": "pw"}),
+    ]
+    report = UserImportReport()
+
+    users = _validate_batch(batch, report, set(), set())
+
+    assert [line for line, _ in users] == [2, 5]
+    assert report.total_rows == 4
+    assert report.invalid == 2
+    # EmailStr already caps addresses at 254 characters
+    assert [(issue.line, issue.reason) for issue in report.issues] == [
+        (3, "invalid_row"),
+        (4, "too_long"),
+    ]
+
+
+def test_passwords_are_hashed_in_order_on_the_shared_pool(monkeypatch):
+    monkeypatch.setattr(settings, "USERS_IMPORT_HASH_WORKERS", 2)
+    passwords = ["pw-1", "pw-2", "pw-3"]
+
+    async def scenario():
+        pool = user_import.get_hash_executor()
+        assert user_import.get_hash_executor() is pool
+        return await user_import._hash_passwords(pool, passwords)
+
+    try:
+        hashed = asyncio.run(scenario())
+    finally:
+        user_import.shutdown_hash_executor()
+
+    assert [verify_password(p, h) for p, h in zip(passwords, hashed)] == [True] * 3
+    assert user_import._hash_executor is None
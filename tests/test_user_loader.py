@@ -0,0 +1,103 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.models.user import User
+from app.services.user_loader import UserLoader
+
+
+def run_with_loader(scenario, batch_window=0.01, max_batch_size=100):
+    """Run `scenario(loader, batches)` against a SQLite table of users 1-5."""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+    batches = []
+
+    class CountingSession:
+        # One session per batch query; record the ids it was asked for
+        def __init__(self):
+            self.session = maker()
+
+        async def __aenter__(self):
+            session = await self.session.__aenter__()
+            execute = session.execute
+
+            async def counted(statement, *args, **kwargs):
+                batches.append(sorted(statement.compile().params["id_1"]))
+                return await execute(statement, *args, **kwargs)
+
+            session.execute = counted
+            return session
+
+        async def __aexit__(self, *exc_info):
+            await self.session.__aexit__(*exc_info)
+
+    async def main():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with maker() as session:
+            session.add_all(
+                User(
+                    id=user_id,
+                    email=f"u{user_id}@example.com",
+                    username=f"u{user_id}",
+                    hashed_password="x",
+                )
+                for user_id in range(1, 6)
+            )
+            await session.commit()
+
+        loader = UserLoader(CountingSession, batch_window, max_batch_size)
+        try:
+            return await scenario(loader, batches)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+def test_concurrent_loads_share_one_query():
+    async def scenario(loader, batches):
+        users = await asyncio.gather(*(loader.load(i) for i in [3, 1, 3, 99, 2]))
+        return users, batches
+
+    users, batches = run_with_loader(scenario)
+    assert [user.username if user else None for user in users] == [
+        "u3",
+        "u1",
+        "u3",
+        None,
+        "u2",
+    ]
+    assert users[0] is users[2]
+    assert batches == [[1, 2, 3, 99]]
+
+
+def test_loads_outside_the_batch_window_get_their_own_query():
+    async def scenario(loader, batches):
+        first = asyncio.ensure_future(loader.load(1))
+        await asyncio.sleep(0.001)
+        # Still within the window that the first load opened
+        second = asyncio.ensure_future(loader.load(2))
+        await asyncio.gather(first, second)
+
+        await asyncio.sleep(0.05)
+        await loader.load(3)
+        return batches
+
+    assert run_with_loader(scenario, batch_window=0.02) == [[1, 2], [3]]
+
+
+def test_full_batches_are_dispatched_without_waiting():
+    async def scenario(loader, batches):
+        pending = asyncio.gather(*(loader.load(i) for i in range(1, 6)))
+        await asyncio.sleep(0.05)
+        # Well within the window: only the size limit can have flushed these
+        early = list(batches)
+        users = await pending
+        return [user.id for user in users], early, batches
+
+    ids, early, batches = run_with_loader(scenario, batch_window=0.2, max_batch_size=2)
+    assert ids == [1, 2, 3, 4, 5]
+    assert early == [[1, 2], [3, 4]]
+    assert batches == [[1, 2], [3, 4], [5]]
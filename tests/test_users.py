@@ -0,0 +1,186 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.api.deps import get_current_superuser, get_current_user
+from app.core import ValidationError
+from app.db.base import Base
+from app.main import app
+from app.models.user import User
+from app.services import user_export
+from app.services.users import _decode_cursor, _encode_cursor, list_users_page
+
+client = TestClient(app)
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 123456)
+    cursor = _encode_cursor(User(id=42, created_at=created_at))
+
+    assert "=" not in cursor
+    assert _decode_cursor(cursor) == (created_at, 42)
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", "bm90IGpzb24", "WzEsIDJd", "W10"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValidationError):
+        _decode_cursor(cursor)
+
+
+def test_pages_follow_created_at_then_id():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+    start = datetime(2024, 1, 1)
+    # Ids 1-3 share a timestamp; id 4 is older than all of them
+    timestamps = [start, start, start, start - timedelta(days=1), start, start]
+
+    async def scenario():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with maker() as session:
+            session.add_all(
+                User(
+                    id=index,
+                    email=f"u{index}@example.com",
+                    username=f"u{index}",
+                    hashed_password="x",
+                    is_active=index != 5,
+                    created_at=created_at,
+                )
+                for index, created_at in enumerate(timestamps, start=1)
+            )
+            await session.commit()
+
+        async def walk(**filters):
+            pages, cursor = [], None
+            async with maker() as session:
+                while True:
+                    users, cursor = await list_users_page(
+                        session, limit=2, cursor=cursor, **filters
+                    )
+                    pages.append([user.id for user in users])
+                    if cursor is None:
+                        return pages
+
+        try:
+            return await walk(), await walk(is_active=True)
+        finally:
+            await engine.dispose()
+
+    everyone, active = asyncio.run(scenario())
+    assert everyone == [[4, 1], [2, 3], [5, 6]]
+    assert active == [[4, 1], [2, 3], [6]]
+
+
+@pytest.mark.parametrize("path", ["/api/v1/users/", "/api/v1/users/1"])
+def test_reading_users_requires_authentication(path):
+    response = client.get(path)
+    assert response.status_code == 401
+
+
+def test_creating_users_requires_authentication():
+    response = client.post(
+        "/api/v1/users/",
+        json={"email": "new@example.com", "username": "new", "password": "pw"},
+    )
+    assert response.status_code == 401
+
+
+def seed_export(monkeypatch):
+    """Point the export at a SQLite database holding users 1-3."""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+    created_at = datetime(2024, 1, 1, 12, 0)
+
+    async def seed():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with maker() as session:
+            session.add_all(
+                User(
+                    id=index,
+                    email=f"u{index}@example.com",
+                    username=f"user, {index}" if index == 2 else f"u{index}",
+                    hashed_password="secret-hash",
+                    is_superuser=index == 1,
+                    created_at=created_at,
+                    updated_at=created_at,
+                )
+                for index in range(1, 4)
+            )
+            await session.commit()
+
+    monkeypatch.setattr(user_export, "read_session", maker)
+    return engine, seed
+
+
+def collect_export(monkeypatch, export_format):
+    engine, seed = seed_export(monkeypatch)
+
+    async def scenario():
+        await seed()
+        try:
+            return [
+                chunk
+                async for chunk in user_export.export_users(export_format, batch_size=2)
+            ]
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(scenario())
+
+
+def test_export_streams_ndjson_in_cursor_batches(monkeypatch):
+    chunks = collect_export(monkeypatch, "ndjson")
+
+    # One chunk per yield_per partition
+    assert [chunk.count(b"\n") for chunk in chunks] == [2, 1]
+    rows = [json.loads(line) for line in b"".join(chunks).splitlines()]
+    assert [row["id"] for row in rows] == [1, 2, 3]
+    assert rows[0] == {
+        "id": 1,
+        "email": "u1@example.com",
+        "username": "u1",
+        "is_active": True,
+        "is_superuser": True,
+        "created_at": "2024-01-01T12:00:00",
+        "updated_at": "2024-01-01T12:00:00",
+    }
+
+
+def test_export_streams_csv_with_a_header(monkeypatch):
+    chunks = collect_export(monkeypatch, "csv")
+
+    assert len(chunks) == 3
+    assert b"secret-hash" not in b"".join(chunks)
+    assert b"".join(chunks).decode().splitlines() == [
+        "id,email,username,is_active,is_superuser,created_at,updated_at",
+        "1,u1@example.com,u1,True,True,2024-01-01 12:00:00,2024-01-01 12:00:00",
+        '2,u2@example.com,"user, 2",True,False,2024-01-01 12:00:00,2024-01-01 12:00:00',
+        "3,u3@example.com,u3,True,False,2024-01-01 12:00:00,2024-01-01 12:00:00",
+    ]
+
+
+def test_export_endpoint_is_admin_only(monkeypatch):
+    engine, seed = seed_export(monkeypatch)
+    asyncio.run(seed())
+    user = SimpleNamespace(id=2, is_active=True, is_superuser=False)
+    monkeypatch.setitem(app.dependency_overrides, get_current_user, lambda: user)
+
+    response = client.get("/api/v1/users/export")
+    assert response.status_code == 403
+
+    monkeypatch.setitem(
+        app.dependency_overrides, get_current_superuser, lambda: SimpleNamespace(id=1)
+    )
+    response = client.get("/api/v1/users/export", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="users.csv"' in response.headers["content-disposition"]
+    assert len(response.text.splitlines()) == 4
+    asyncio.run(engine.dispose())
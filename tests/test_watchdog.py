@@ -0,0 +1,30 @@
+import asyncio
+import time
+
+from app.core.watchdog import LoopWatchdog
+
+
+def test_stall_is_reported_with_stack_and_route():
+    watchdog = LoopWatchdog(interval=0.02, threshold=0.1, max_stack_depth=20)
+
+    async def handler(scope):
+        time.sleep(0.4)  # blocks the loop
+
+    async def scenario():
+        watchdog.start()
+        await asyncio.sleep(0.05)
+        await handler({"type": "http", "method": "GET", "path": "/api/v1/users/7"})
+        await asyncio.sleep(0.05)
+        await watchdog.stop()
+
+    asyncio.run(scenario())
+
+    stall = watchdog.last_stall
+    assert stall is not None
+    assert stall["stalled_ms"] >= 100
+    assert stall["request"] == {
+        "method": "GET",
+        "path": "/api/v1/users/7",
+        "route": "unknown",
+    }
+    assert any("time.sleep(0.4)" in line for line in stall["stack_frames"])